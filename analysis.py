@@ -6,6 +6,16 @@
 Contains single hypothesis of single aspect of things.
 """
 
+# UPOS values that fromape and fromgiella can produce
+UPOSES = ['NOUN', 'VERB', 'ADV', 'ADJ', 'ADP', 'INTJ', 'PUNCT', 'SYM',
+          'CCONJ', 'SCONJ', 'PRON', 'NUM', 'PROPN', 'DET', 'AUX', 'PART',
+          'X']
+
+# tag string => decoded tags, shared by all analyses
+APETAGS = dict()
+GIELLATAGS = dict()
+TAGCACHESIZE = 65536
+
 
 class Analysis:
     """Contains a single analysis of a token.
@@ -78,10 +88,57 @@ class Analysis:
                 # remove tags before compound boundaries for now
                 giella = giella[0:giella.find('+')] +\
                         giella[giella.rfind('#'):]
-        fields = giella.split("+")
-        a.lemmas = fields[0].split('#')
+        lemma, _, tags = giella.partition('+')
+        a.lemmas = lemma.split('#')
         a.weight = len(a.lemmas) - 1.0
-        for f in fields[1:]:
+        a.upos, ufeats, misc = Analysis.decode_giellatags(tags)
+        a.ufeats = dict(ufeats)
+        a.misc = dict(misc)
+        return a
+
+    @staticmethod
+    def fromgiellatags(lemmas: list, tags: tuple):
+        '''Constructs analysis from lemmas and giella tags that are already
+        split, e.g. from a reading in VISL CG 3 format.
+
+        Args:
+            lemmas  lemmas of compound parts, head last
+            tags    giella tags, `('?',)` for unknown words
+
+        Returns:
+            an analysis parsed into structured information
+        '''
+        a = Analysis()
+        if tags == ('?',):
+            a.lemmas = ['#'.join(lemmas)]
+            a.upos = 'X'
+            return a
+        a.lemmas = lemmas
+        a.weight = len(lemmas) - 1.0
+        a.upos, ufeats, misc = Analysis.decode_giellatags(tags)
+        a.ufeats = dict(ufeats)
+        a.misc = dict(misc)
+        return a
+
+    @staticmethod
+    def decode_giellatags(tags):
+        '''Decodes giella tag string, i.e. `tag+tag`, or tuple of tags into
+        UD.
+
+        Results are cached by tag string or tuple, so each distinct tag
+        sequence is decoded only once.
+
+        Returns:
+            upos, ufeats dict and misc dict, the dicts must not be modified
+        '''
+        decoded = GIELLATAGS.get(tags)
+        if decoded is not None:
+            return decoded
+        a = Analysis()
+        fields = tags
+        if isinstance(tags, str):
+            fields = tags.split("+") if tags else []
+        for f in fields:
             if f == 'N':
                 a.upos = 'NOUN'
             elif f == 'A':
@@ -324,7 +381,11 @@ class Analysis:
             else:
                 print("unknown giella", f)
                 exit(2)
-        return a
+        if len(GIELLATAGS) >= TAGCACHESIZE:
+            GIELLATAGS.clear()
+        decoded = a.upos, a.ufeats, a.misc
+        GIELLATAGS[tags] = decoded
+        return decoded
 
     @staticmethod
     def fromape(ape: str):
@@ -347,10 +408,30 @@ class Analysis:
                 ape = ape[0:ape.find('<')] + ape[ape.rfind('#'):]
         if '+' in ape:
             ape = ape.replace('+', '<+')
-        fields = [tag.strip('>') for tag in ape.split("<")]
-        a.lemmas = fields[0].split('#')
+        lemma, _, tags = ape.partition('<')
+        a.lemmas = lemma.strip('>').split('#')
         a.weight = len(a.lemmas) - 1.0
-        for f in fields[1:]:
+        a.upos, ufeats, misc = Analysis.decode_apetags(tags)
+        a.ufeats = dict(ufeats)
+        a.misc = dict(misc)
+        return a
+
+    @staticmethod
+    def decode_apetags(tags: str):
+        '''Decodes apertium tag string, i.e. `tag><tag>` into UD.
+
+        Results are cached by tag string, so each distinct tag sequence is
+        decoded only once.
+
+        Returns:
+            upos, ufeats dict and misc dict, the dicts must not be modified
+        '''
+        decoded = APETAGS.get(tags)
+        if decoded is not None:
+            return decoded
+        a = Analysis()
+        fields = [tag.strip('>') for tag in tags.split("<")] if tags else []
+        for f in fields:
             if f == 'n':
                 a.upos = 'NOUN'
             elif f == 'adj':
@@ -525,7 +606,11 @@ class Analysis:
             else:
                 print("unknown ape", f)
                 exit(2)
-        return a
+        if len(APETAGS) >= TAGCACHESIZE:
+            APETAGS.clear()
+        decoded = a.upos, a.ufeats, a.misc
+        APETAGS[tags] = decoded
+        return decoded
 
     def get_ud_misc(self):
         '''Get random collection of analyses for token.
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Converting many input files in one process with one loaded grammar.
+
+Inputs can be given as paths, glob patterns or files listing one path per
+line. Each input is converted with sentence ids from its path, either into
+one shared output or into its own file in an output directory, optionally
+in parallel processes forked after the grammar is loaded.
+"""
+
+import glob
+import multiprocessing
+import os
+
+from compressed import SUFFIXES, open_input
+from pipeline import Pipeline
+
+# state of a worker process, pipeline set by init_worker
+WORKER = dict()
+
+
+def expand_inputs(patterns: list, listfiles: list):
+    '''Expand glob patterns and list files into list of input paths.'''
+    paths = list()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                print("No inputs match", pattern)
+                exit(2)
+            paths += matches
+        else:
+            paths.append(pattern)
+    for listfile in listfiles:
+        with open(listfile, encoding='utf-8') as f:
+            paths += [line.strip() for line in f if line.strip()]
+    for path in paths:
+        if not os.path.isfile(path):
+            print("Cannot read input", path)
+            exit(2)
+    return paths
+
+
+def output_paths(paths: list, output_dir: str, suffix: str):
+    '''Map input paths to outputs in output_dir named after their basename
+    without compression suffix.
+    '''
+    outputs = dict()
+    for path in paths:
+        name = os.path.basename(path)
+        if os.path.splitext(name)[1] in SUFFIXES:
+            name = os.path.splitext(name)[0]
+        name = os.path.splitext(name)[0] + suffix
+        output = os.path.join(output_dir, name)
+        if output in outputs.values():
+            print("Inputs with same name would overwrite", output)
+            exit(2)
+        outputs[path] = output
+    return outputs
+
+
+def init_worker(pipeline: Pipeline):
+    '''Set pipeline inherited from the parent for jobs of a worker.'''
+    WORKER['pipeline'] = pipeline
+
+
+def convert_job(job: tuple):
+    '''Convert one (path, output) in a worker process.
+
+    Errors exit in the worker like everywhere else, the exit is returned
+    so that the parent can exit instead of waiting for a lost job.
+
+    Returns:
+        path, number of sentences, counts of linguistication and SystemExit
+        of the conversion or None
+    '''
+    pipeline = WORKER['pipeline']
+    before = dict(pipeline.counts)
+    try:
+        sentences = pipeline.convert(*job)
+    except SystemExit as e:
+        return job[0], 0, dict(), e
+    counts = dict()
+    for name, count in pipeline.counts.items():
+        counts[name] = count - before[name]
+    return job[0], sentences, counts, None
+
+
+def run_batch(pipeline: Pipeline, paths: list, output_dir=None, outfile=None,
+              suffix='.conllu', jobs=1, verbose=False):
+    '''Convert all inputs in paths.
+
+    Without output_dir all output goes to outfile in order of paths. More
+    than one job needs output_dir.
+
+    Returns:
+        number of sentences in all inputs
+    '''
+    sentences = 0
+    if not output_dir:
+        for path in paths:
+            with open_input(path) as infile:
+                count = pipeline.run(infile, path, outfile)
+            sentences += count
+            if verbose:
+                print(path, "done with", count, "sentences")
+        return sentences
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = output_paths(paths, output_dir, suffix)
+    if jobs > 1:
+        # workers share the grammar copy-on-write
+        pipeline.disamparsulator.freeze()
+        with multiprocessing.get_context('fork').Pool(
+                jobs, initializer=init_worker,
+                initargs=(pipeline,)) as pool:
+            for path, count, counts, exited in pool.imap(convert_job,
+                                                         outputs.items()):
+                if exited is not None:
+                    exit(exited.code)
+                sentences += count
+                pipeline.count(counts)
+                if verbose:
+                    print(path, "done with", count, "sentences")
+        return sentences
+    for path, output in outputs.items():
+        count = pipeline.convert(path, output)
+        sentences += count
+        if verbose:
+            print(path, "done with", count, "sentences")
+    return sentences
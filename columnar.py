@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Columnar binary storage for linguisticated sentences.
+
+The file stores 1-best token data column by column so that it can be read
+back with mmap without parsing. Layout, all numbers in little endian:
+
+    magic       8 bytes, b'LEGCOL1\\n'
+    headerlen   uint32, length of header
+    header      JSON object: {"sentences": count, "tokens": count,
+                "columns": {name: [typecode, offset, length]}}
+    padding     zero bytes up to multiple of 8
+    columns     each column starts at data start + offset, is padded to
+                multiple of 8 and contains length items of array typecode
+
+Token columns have one item per token:
+
+    surface, lemma, upos, feats, deprel     int32 index to string table
+    head                                    int32, -1 for no head
+    weight                                  float64, inf for no analysis
+
+Sentence columns are sentid, int32 index to string table, and tokenstart,
+int64 index of sentence's first token, with one extra item for the end.
+String table NAME is stored as NAME.blob with UTF-8 strings one after
+another and NAME.offsets with int64 start of each string plus the end.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b'LEGCOL1\n'
+
+TOKENCOLUMNS = ['surface', 'lemma', 'upos', 'feats', 'head', 'deprel',
+                'weight']
+
+STRINGCOLUMNS = ['surface', 'lemma', 'upos', 'feats', 'deprel', 'sentid']
+
+
+class StringTable:
+    """Interned strings with indices in order of first appearance."""
+
+    def __init__(self):
+        """Create empty table."""
+        self.indices = dict()
+        self.strings = list()
+
+    def intern(self, s: str):
+        """Get index of s adding it if needed."""
+        if s not in self.indices:
+            self.indices[s] = len(self.strings)
+            self.strings.append(s)
+        return self.indices[s]
+
+
+class ColumnarWriter:
+    """Writes sentences into columnar file, whole file is written at close.
+    """
+
+    def __init__(self, f):
+        """Create writer for binary file object f."""
+        self.f = f
+        self.tables = dict()
+        for name in STRINGCOLUMNS:
+            self.tables[name] = StringTable()
+        self.columns = dict()
+        for name in TOKENCOLUMNS + ['sentid']:
+            self.columns[name] = array('d' if name == 'weight' else 'i')
+        self.columns['tokenstart'] = array('q', [0])
+
+    def write(self, sentence):
+        '''Add 1-best analyses of sentence.'''
+        columns = self.columns
+        tables = self.tables
+        for token in sentence.tokens:
+            lemma = token.surf
+            upos = 'X'
+            feats = '_'
+            head = -1
+            deprel = '_'
+            weight = float('inf')
+            anal = token.get_best()
+            if anal:
+                upos = anal.get_upos()
+                lemmas = anal.get_lemmas()
+                if lemmas:
+                    lemma = '#'.join(lemmas)
+                feats = anal.printable_ud_feats()
+                deprel = anal.printable_udepname()
+                if anal.printable_udephead() != '_':
+                    head = int(anal.printable_udephead())
+                weight = anal.weight
+            columns['surface'].append(tables['surface'].intern(token.surf))
+            columns['lemma'].append(tables['lemma'].intern(lemma))
+            columns['upos'].append(tables['upos'].intern(upos))
+            columns['feats'].append(tables['feats'].intern(feats))
+            columns['head'].append(head)
+            columns['deprel'].append(tables['deprel'].intern(deprel))
+            columns['weight'].append(weight)
+        columns['sentid'].append(tables['sentid'].intern(sentence.id))
+        columns['tokenstart'].append(len(columns['surface']))
+
+    def close(self):
+        '''Write the file out.'''
+        arrays = dict(self.columns)
+        for name, table in self.tables.items():
+            blob = array('B')
+            offsets = array('q', [0])
+            for s in table.strings:
+                blob.frombytes(s.encode('utf-8'))
+                offsets.append(len(blob))
+            arrays[name + '.blob'] = blob
+            arrays[name + '.offsets'] = offsets
+        header = {'sentences': len(self.columns['sentid']),
+                  'tokens': len(self.columns['surface']),
+                  'columns': dict()}
+        offset = 0
+        for name, column in arrays.items():
+            header['columns'][name] = [column.typecode, offset, len(column)]
+            offset += padded(len(column) * column.itemsize)
+        headerbytes = json.dumps(header).encode('utf-8')
+        self.f.write(MAGIC)
+        self.f.write(struct.pack('<I', len(headerbytes)))
+        self.f.write(headerbytes)
+        start = len(MAGIC) + 4 + len(headerbytes)
+        self.f.write(bytes(padded(start) - start))
+        for column in arrays.values():
+            if sys.byteorder != 'little':
+                column = array(column.typecode, column)
+                column.byteswap()
+            data = column.tobytes()
+            self.f.write(data)
+            self.f.write(bytes(padded(len(data)) - len(data)))
+        self.f.flush()
+
+
+class ColumnarReader:
+    """Reads columnar file through mmap without parsing the data."""
+
+    def __init__(self, path: str):
+        """Open columnar file from path."""
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(MAGIC)] != MAGIC:
+            print("Not a columnar file:", path)
+            exit(2)
+        headerlen = struct.unpack('<I', self.mm[len(MAGIC):len(MAGIC) + 4])[0]
+        start = len(MAGIC) + 4
+        self.header = json.loads(self.mm[start:start + headerlen])
+        self.datastart = padded(start + headerlen)
+        self.views = dict()
+
+    def column(self, name: str):
+        '''Get column as memoryview or array of its typecode.'''
+        if name not in self.views:
+            typecode, offset, length = self.header['columns'][name]
+            start = self.datastart + offset
+            end = start + length * array(typecode).itemsize
+            view = memoryview(self.mm)[start:end]
+            if sys.byteorder != 'little':
+                view = array(typecode, view.tobytes())
+                view.byteswap()
+            else:
+                view = view.cast(typecode)
+            self.views[name] = view
+        return self.views[name]
+
+    def string(self, table: str, index: int):
+        '''Get string at index of string table.'''
+        offsets = self.column(table + '.offsets')
+        blob = self.column(table + '.blob')
+        return bytes(blob[offsets[index]:offsets[index + 1]]).decode('utf-8')
+
+    def sentence(self, i: int):
+        '''Get sentence i as sent id and list of CONLL-U-like tuples.
+
+        Tuples have position, surface, lemma, upos, feats, head, deprel and
+        weight.
+        '''
+        starts = self.column('tokenstart')
+        tokens = list()
+        for pos, t in enumerate(range(starts[i], starts[i + 1]), 1):
+            tokens.append((pos,
+                           self.string('surface', self.column('surface')[t]),
+                           self.string('lemma', self.column('lemma')[t]),
+                           self.string('upos', self.column('upos')[t]),
+                           self.string('feats', self.column('feats')[t]),
+                           self.column('head')[t],
+                           self.string('deprel', self.column('deprel')[t]),
+                           self.column('weight')[t]))
+        return self.string('sentid', self.column('sentid')[i]), tokens
+
+    def __len__(self):
+        '''Number of sentences.'''
+        return self.header['sentences']
+
+    def close(self):
+        '''Release the mmap.'''
+        for view in self.views.values():
+            if isinstance(view, memoryview):
+                view.release()
+        self.views = dict()
+        self.mm.close()
+
+
+def padded(n: int):
+    '''Round n up to multiple of 8.'''
+    return (n + 7) // 8 * 8
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Reading and writing gzip, bzip2 and xz compressed streams transparently.
+
+Compression and decompression run in a background thread that passes
+chunks through a bounded queue, so they overlap with linguistication
+instead of taking turns with it. Compressed inputs are recognised from
+their magic bytes and outputs from their file name suffix.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import sys
+import threading
+import zlib
+
+# magic bytes => module to open compressed data with
+MAGICS = [(b'\x1f\x8b', gzip), (b'BZh', bz2), (b'\xfd7zXZ\x00', lzma)]
+
+SUFFIXES = {'.gz': gzip, '.bz2': bz2, '.xz': lzma}
+
+CHUNKSIZE = 1 << 20
+QUEUESIZE = 8
+
+
+def compression_of(f):
+    '''Get compression module for peekable binary file f or None.'''
+    head = f.peek(8)[:8]
+    for magic, module in MAGICS:
+        if head.startswith(magic):
+            return module
+    return None
+
+
+class BackgroundReader(io.RawIOBase):
+    """Raw stream of data decompressed from file in background thread."""
+
+    def __init__(self, f, module, name: str):
+        """Decompress binary file f with module gzip, bz2 or lzma."""
+        super().__init__()
+        self.name = name
+        self.chunks = queue.Queue(QUEUESIZE)
+        self.chunk = memoryview(b'')
+        self.error = None
+        self.thread = threading.Thread(target=self.decompress,
+                                       args=(module.open(f, 'rb'),),
+                                       daemon=True)
+        self.thread.start()
+
+    def decompress(self, compressed):
+        '''Read decompressed chunks into queue until end.'''
+        try:
+            while True:
+                chunk = compressed.read(CHUNKSIZE)
+                if not chunk:
+                    break
+                self.chunks.put(chunk)
+        except (OSError, EOFError, ValueError, lzma.LZMAError,
+                zlib.error) as e:
+            self.error = e
+        finally:
+            # end of file even if reading failed, readinto never waits
+            self.chunks.put(b'')
+            compressed.close()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        '''Fill b from decompressed chunks.'''
+        if not self.chunk:
+            chunk = self.chunks.get()
+            if not chunk:
+                # keep returning end of file
+                self.chunks.put(b'')
+                if self.error:
+                    print("Cannot decompress", self.name + ":", self.error)
+                    exit(2)
+                return 0
+            self.chunk = memoryview(chunk)
+        n = min(len(b), len(self.chunk))
+        b[:n] = self.chunk[:n]
+        self.chunk = self.chunk[n:]
+        return n
+
+
+class BackgroundWriter(io.RawIOBase):
+    """Raw stream compressed into file in background thread."""
+
+    def __init__(self, path: str, module):
+        """Compress into file in path with module gzip, bz2 or lzma."""
+        super().__init__()
+        self.name = path
+        self.chunks = queue.Queue(QUEUESIZE)
+        self.error = None
+        self.thread = threading.Thread(target=self.compress,
+                                       args=(module.open(path, 'wb'),),
+                                       daemon=True)
+        self.thread.start()
+
+    def compress(self, compressed):
+        '''Write chunks from queue until None, keeping error if any.'''
+        chunk = self.chunks.get()
+        try:
+            with compressed:
+                while chunk is not None:
+                    compressed.write(chunk)
+                    chunk = self.chunks.get()
+        except (OSError, ValueError) as e:
+            self.error = e
+        finally:
+            # take the rest after a failure so that write never blocks
+            while chunk is not None:
+                chunk = self.chunks.get()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        '''Queue copy of b for compression.'''
+        if self.error:
+            raise self.error
+        self.chunks.put(bytes(b))
+        return len(b)
+
+    def close(self):
+        '''Finish compressing and wait for the file to be written.'''
+        if not self.closed:
+            self.chunks.put(None)
+            self.thread.join()
+        super().close()
+        if self.error:
+            error, self.error = self.error, None
+            raise error
+
+
+def open_input(path: str, binary=None):
+    '''Open path or binary file for reading text, decompressing if needed.
+
+    Args:
+        path    name of file to open and of the stream
+        binary  binary file to read instead of opening path, e.g. stdin
+    '''
+    if binary is None:
+        binary = open(path, 'rb')
+    if not hasattr(binary, 'peek'):
+        binary = io.BufferedReader(binary)
+    module = compression_of(binary)
+    if module:
+        binary = io.BufferedReader(BackgroundReader(binary, module, path),
+                                   CHUNKSIZE)
+    return io.TextIOWrapper(binary, encoding='utf-8')
+
+
+def open_output(path: str):
+    '''Open path for writing text, compressing if suffix says so.
+
+    Path - is stdout like with argparse.FileType.
+    '''
+    if path == '-':
+        return sys.stdout
+    for suffix, module in SUFFIXES.items():
+        if path.endswith(suffix):
+            return io.TextIOWrapper(io.BufferedWriter(BackgroundWriter(
+                path, module), CHUNKSIZE), encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+
+def is_compressed(path: str):
+    '''Check if file in path is compressed.'''
+    with open(path, 'rb') as f:
+        return compression_of(f) is not None
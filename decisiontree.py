@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+"""
+Compiles the matchers of a whole grammar into one decision tree, so that
+classifying an analysis finds all the matchers it satisfies at once instead
+of trying each matcher in turn.
+"""
+
+from analysis import Analysis
+
+
+class FeatNode:
+    """A node testing one UD feat, or a leaf if feat is None."""
+
+    def __init__(self):
+        """Create an empty leaf."""
+        self.feat = None
+        # matchers whose all tests have passed when reaching this node
+        self.matched = set()
+        # value of feat => subtree
+        self.values = dict()
+        # subtree for agreements, i.e. feat with any value
+        self.present = None
+        # subtree for matchers not testing this feat, always followed
+        self.rest = None
+
+
+class DecisionTree:
+    """Decision tree over UPOS, lemma and UD feats of analyses.
+
+    Each level of the tree has a branch for matchers that do not care about
+    that level, so classification follows few paths at the same time but
+    still visits each relevant node only once. Lemma patterns are tested
+    once per distinct compiled regex of matchers.
+    """
+
+    def __init__(self):
+        """Create an empty tree that matches nothing."""
+        self.matchers = list()
+        # upos => lemma => FeatNode, None key for matchers without upos or
+        # lemma
+        self.root = dict()
+        # upos => regex pattern => (regex, FeatNode) for lemma patterns
+        self.patterned = dict()
+
+    def compile(self, matchers: list):
+        """Build tree from matchers, same matcher objects may repeat."""
+        self.matchers = list()
+        seen = set()
+        for matcher in matchers:
+            if id(matcher) not in seen:
+                seen.add(id(matcher))
+                self.matchers.append(matcher)
+        entries = dict()
+        patternentries = dict()
+        for matcher in self.matchers:
+            matcher.compile_lemmas()
+            uposes = matcher.uposes if matcher.uposes else [None]
+            if matcher.lemmas or matcher.lemmaregex:
+                lemmas = matcher.lemmas
+            else:
+                lemmas = [None]
+            conjunctions = list()
+            if not matcher.ufeatses:
+                conjunctions.append(dict())
+            for ufeats in matcher.ufeatses:
+                conjunction = dict()
+                for feat, value in ufeats.items():
+                    if matcher.is_ufeat_agreement(feat):
+                        conjunction[feat] = None
+                    else:
+                        conjunction[feat] = value
+                conjunctions.append(conjunction)
+            for upos in uposes:
+                for lemma in lemmas:
+                    for conjunction in conjunctions:
+                        entries.setdefault(upos, dict()).setdefault(
+                            lemma, list()).append((matcher, conjunction))
+                if not matcher.lemmaregex:
+                    continue
+                regex = matcher.lemmaregex
+                for conjunction in conjunctions:
+                    patternentries.setdefault(upos, dict()).setdefault(
+                        regex.pattern, (regex, list()))[1].append(
+                            (matcher, conjunction))
+        self.root = dict()
+        for upos, lemmaentries in entries.items():
+            self.root[upos] = dict()
+            for lemma, featentries in lemmaentries.items():
+                self.root[upos][lemma] = self.build_feats(featentries)
+        self.patterned = dict()
+        for upos, regexentries in patternentries.items():
+            self.patterned[upos] = dict()
+            for pattern, (regex, featentries) in regexentries.items():
+                self.patterned[upos][pattern] = \
+                    (regex, self.build_feats(featentries))
+
+    def build_feats(self, entries: list):
+        """Build feat tests for list of matcher, conjunction pairs."""
+        node = FeatNode()
+        remaining = list()
+        for matcher, conjunction in entries:
+            if not conjunction:
+                node.matched.add(matcher)
+            else:
+                remaining.append((matcher, conjunction))
+        if not remaining:
+            return node
+        # test most commonly used feat first to keep the tree shallow
+        counts = dict()
+        for _, conjunction in remaining:
+            for feat in conjunction:
+                counts[feat] = counts.get(feat, 0) + 1
+        node.feat = max(sorted(counts), key=lambda feat: counts[feat])
+        values = dict()
+        present = list()
+        rest = list()
+        for matcher, conjunction in remaining:
+            if node.feat not in conjunction:
+                rest.append((matcher, conjunction))
+                continue
+            value = conjunction[node.feat]
+            conjunction = dict(conjunction)
+            del conjunction[node.feat]
+            if value is None:
+                present.append((matcher, conjunction))
+            else:
+                values.setdefault(value, list()).append((matcher,
+                                                         conjunction))
+        for value, valueentries in values.items():
+            node.values[value] = self.build_feats(valueentries)
+        if present:
+            node.present = self.build_feats(present)
+        if rest:
+            node.rest = self.build_feats(rest)
+        return node
+
+    def classify(self, analysis: Analysis):
+        """Find all matchers that match analysis.
+
+        Equals to trying Matcher.matches of every compiled matcher without
+        agreements bound.
+
+        Returns:
+            set of matcher objects
+        """
+        matched = set()
+        lemma = '#'.join(analysis.lemmas)
+        nodes = list()
+        for upos in [analysis.upos, None]:
+            if upos in self.root:
+                for lemmakey in [lemma, None]:
+                    if lemmakey in self.root[upos]:
+                        nodes.append(self.root[upos][lemmakey])
+            if upos in self.patterned:
+                for regex, node in self.patterned[upos].values():
+                    if regex.fullmatch(lemma):
+                        nodes.append(node)
+            if upos is None:
+                break
+        while nodes:
+            node = nodes.pop()
+            matched |= node.matched
+            if node.feat is None:
+                continue
+            if node.rest:
+                nodes.append(node.rest)
+            if node.feat not in analysis.ufeats:
+                continue
+            value = analysis.ufeats[node.feat]
+            if value in node.values:
+                nodes.append(node.values[value])
+            if node.present:
+                nodes.append(node.present)
+        return matched
+
+    def __len__(self):
+        """Number of distinct matchers in the tree."""
+        return len(self.matchers)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Differential testing of linguisticate engines against the reference one.
+
+Each input line is linguisticated by Disamparsulator.linguisticate_reference,
+which tries every rule on every token, and by the engine under test. Results
+are compared hypothesis by hypothesis, weights with a tolerance. Lines that
+differ are shrunk to a minimal sublist of tokens that still differs, so they
+can be added to the test data as is.
+
+The reference engine shares Evidence and Matcher code with the others, so
+with --expected the output is instead compared to CONLL-U written by a known
+good revision, such as golden.conllu and golden-debug.conllu made from
+golden.apeslines with testrules.xml before any optimisations.
+"""
+
+import difflib
+import re
+from argparse import ArgumentParser
+from time import perf_counter
+
+from disamparsulator import Disamparsulator
+from sentence import Sentence
+
+
+def engines(disamparsulator: Disamparsulator):
+    '''Linguisticate functions by name, reference being the baseline.'''
+    return {'reference': disamparsulator.linguisticate_reference,
+            'default': disamparsulator.linguisticate}
+
+
+def hypotheses(sentence: Sentence):
+    '''List all hypotheses of sentence as tuples of CONLL-U fields and
+    weight.'''
+    hyps = list()
+    for token in sentence.tokens:
+        for anal in token.analyses:
+            hyps.append((token.pos, token.surf, '#'.join(anal.get_lemmas()),
+                         anal.get_upos(), anal.printable_ud_feats(),
+                         anal.printable_udephead(),
+                         anal.printable_udepname(), anal.weight))
+    return hyps
+
+
+def differences(expected: Sentence, actual: Sentence, tolerance=1e-9):
+    '''Compare hypotheses of two linguisticated sentences.
+
+    Returns:
+        list of (expected, actual) hypothesis pairs that differ, with None
+        for missing ones.
+    '''
+    diffs = list()
+    expecteds = hypotheses(expected)
+    actuals = hypotheses(actual)
+    for i in range(max(len(expecteds), len(actuals))):
+        e = expecteds[i] if i < len(expecteds) else None
+        a = actuals[i] if i < len(actuals) else None
+        if e is None or a is None or e[:-1] != a[:-1]:
+            diffs.append((e, a))
+        elif e[-1] != a[-1] and abs(e[-1] - a[-1]) > tolerance:
+            diffs.append((e, a))
+    return diffs
+
+
+def run(linguisticate, line: str, **kw):
+    '''Parse and linguisticate line with engine.'''
+    sentence = Sentence.fromapeline(line.strip(), **kw)
+    linguisticate(sentence)
+    return sentence
+
+
+def differs(reference, engine, line: str, tolerance: float, **kw):
+    '''Check if engine gives different result than reference for line.'''
+    return bool(differences(run(reference, line, **kw),
+                            run(engine, line, **kw), tolerance))
+
+
+def minimise(reference, engine, line: str, tolerance: float, **kw):
+    '''Shrink line to fewest tokens that still give a difference.
+
+    Uses delta debugging over the tokens of the ape line.
+    '''
+    units = re.findall(r'[^$]*\$', line.strip())
+    n = 2
+    while len(units) >= 2:
+        chunk = -(-len(units) // n)
+        for start in range(0, len(units), chunk):
+            rest = units[:start] + units[start + chunk:]
+            if rest and differs(reference, engine, ''.join(rest), tolerance,
+                                **kw):
+                units = rest
+                n = max(n - 1, 2)
+                break
+        else:
+            if n >= len(units):
+                break
+            n = min(n * 2, len(units))
+    return ''.join(units).strip()
+
+
+def read_conllu(f):
+    '''Read CONLL-U file into list of sentences without sent_id lines.'''
+    sentences = list()
+    lines = list()
+    for line in f:
+        if not line.strip():
+            if lines:
+                sentences.append(''.join(lines))
+            lines = list()
+        elif not line.startswith('# sent_id = '):
+            lines.append(line)
+    if lines:
+        sentences.append(''.join(lines))
+    return sentences
+
+
+def golden_differences(linguisticate, f, expected: list, debug=False,
+                       **kw):
+    '''Compare output of engine for input file f to expected sentences.
+
+    Sentences are printed like legproc does, ambiguously if debug is set.
+
+    Returns:
+        list of (line number, expected, actual) of sentences that differ,
+        with None for missing ones.
+    '''
+    diffs = list()
+    actuals = list()
+    for lineno, line in enumerate(f, 1):
+        sentence = run(linguisticate, line, **kw)
+        if not sentence.text:
+            continue
+        if debug:
+            actuals.append((lineno, sentence.printable_ambigonllu()))
+        else:
+            actuals.append((lineno, sentence.printable_conllu()))
+    for i in range(max(len(expected), len(actuals))):
+        lineno, actual = actuals[i] if i < len(actuals) else (None, None)
+        e = expected[i] if i < len(expected) else None
+        if e != actual:
+            diffs.append((lineno, e, actual))
+    return diffs
+
+
+def main():
+    """Compare engines over a corpus."""
+    a = ArgumentParser()
+    a.add_argument('-i', '--input', metavar="INFILE", type=open,
+                   required=True, help="apertium stream to test with")
+    a.add_argument('-e', '--expected', metavar="CONLLU", type=open,
+                   help="compare to CONLL-U of known good revision instead "
+                   "of the reference engine")
+    a.add_argument('--debug', default=False, action='store_true',
+                   help="expected CONLL-U has all hypotheses")
+    a.add_argument('--not-rules', metavar="RULEFILE", type=open, required=True,
+                   action='append',
+                   help="read non-rules from RULEFILE, can be repeated")
+    a.add_argument('--engine', default='default',
+                   help="engine to compare against reference")
+    a.add_argument('--tolerance', type=float, default=1e-9,
+                   help="largest weight difference taken as equal")
+    a.add_argument('--giella', default=False, action='store_true',
+                   help="use giella instead of ape parsing")
+    options = a.parse_args()
+    disamparsulator = Disamparsulator()
+    disamparsulator.frobblesnizz(*options.not_rules)
+    available = engines(disamparsulator)
+    if options.engine not in available:
+        print("Unknown engine", options.engine, "use one of",
+              *available)
+        exit(1)
+    reference = available['reference']
+    engine = available[options.engine]
+    kw = dict()
+    if options.giella:
+        kw['reformat'] = 'giella'
+    if options.expected:
+        diffs = golden_differences(engine, options.input,
+                                   read_conllu(options.expected),
+                                   options.debug, **kw)
+        for lineno, e, a in diffs:
+            print("Line", lineno, "differs from expected")
+            for line in difflib.unified_diff((e or '').splitlines(),
+                                             (a or '').splitlines(),
+                                             'expected', 'actual',
+                                             lineterm=''):
+                print("  " + line)
+        print("Differing:", len(diffs))
+        exit(1 if diffs else 0)
+    times = {'reference': 0.0, 'engine': 0.0}
+    lines = 0
+    failures = 0
+    for lineno, line in enumerate(options.input, 1):
+        if not line.strip():
+            continue
+        lines += 1
+        start = perf_counter()
+        expected = run(reference, line, **kw)
+        middle = perf_counter()
+        actual = run(engine, line, **kw)
+        times['reference'] += middle - start
+        times['engine'] += perf_counter() - middle
+        diffs = differences(expected, actual, options.tolerance)
+        if not diffs:
+            continue
+        failures += 1
+        print("Line", lineno, "differs in", len(diffs), "hypotheses")
+        for e, a in diffs[:5]:
+            print("  expected", e)
+            print("  actual  ", a)
+        print("  minimal:", minimise(reference, engine, line,
+                                     options.tolerance, **kw))
+    print("Lines:", lines, "Differing:", failures)
+    print("Reference time:", times['reference'], options.engine, "time:",
+          times['engine'], "Speed-up:",
+          times['reference'] / times['engine'] if times['engine'] else 0)
+    exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,20 @@ same time. Pay no attention to the man behind the curtains and move along.
 """
 
 # stuff
+import gc
+import os
+import re
 import xml.etree.ElementTree
+from hashlib import sha1
+from time import perf_counter
 from xml.etree.ElementTree import Element
 
+from decisiontree import DecisionTree
 from evidence import Evidence
-from matcher import Matcher
+from matcher import LEMMAPATTERNS, Matcher
+from parsestate import ParseState
+from targetcache import TargetCache
+from tracing import HOOKS, emit
 
 
 class Disamparsulator:
@@ -20,31 +29,159 @@ class Disamparsulator:
 
     def __init__(self):
         self.rules = list()
+        # all targets compiled together
+        self.tree = DecisionTree()
+        # target matcher => indices of rules using it
+        self.targetrules = dict()
+        # matcher => bit of it in bitmaps of readings
+        self.matcherbits = dict()
+        # indices of rules that do nothing to unambiguous tokens
+        self.reweighing = set()
+        # limits of seconds and rule operations per sentence, 0 for none
+        self.time_budget = 0
+        self.op_budget = 0
+        # set when rules can no longer be loaded
+        self.frozen = False
+        # target matches of readings seen in this run
+        self.targetcache = TargetCache(self.tree, set(), self.matcherbits)
+        # MemoryStats to measure linguistication with if any
+        self.memstats = None
 
-    def frobblesnizz(self, f):
-        '''parse disampursalations from XML file.'''
-        xmltree = xml.etree.ElementTree.parse(f)
-        root = xmltree.getroot()
-        if root.get("version") != "0.0.0":
-            print("Unsupported version", root.get("version"))
-        rules = list()
-        for child in root:
-            # parse stuff
-            if child.tag == 'evidences':
-                self.parse_evidences(child)
-            else:
-                print("Unknown element disamparsulations:", child.tag)
-                exit(2)
-        return rules
+    def frobblesnizz(self, *files):
+        '''parse disampursalations from XML files.
+
+        Files are streamed one evidence at a time and documentation is thrown
+        away as soon as it is read, so memory use does not depend on size of
+        the documentation. Files may include other files.
+        '''
+        if self.frozen:
+            print("Cannot load more rules into frozen disamparsulator")
+            exit(1)
+        included = set()
+        for f in files:
+            self.stream_disamparsulations(f, included)
+        self.optimise()
+        return self.rules
+
+    def stream_disamparsulations(self, f, included: set):
+        '''Read evidences from file f that is a path or an open file.'''
+        filename = f if isinstance(f, str) else getattr(f, 'name', '')
+        if filename:
+            if os.path.realpath(filename) in included:
+                print("Skipping recursive include of", filename)
+                return
+            included.add(os.path.realpath(filename))
+        elements = list()
+        documentations = 0
+        for event, element in xml.etree.ElementTree.iterparse(
+                f, events=('start', 'end')):
+            if event == 'start':
+                if not elements and \
+                        element.get("version") != "0.0.0":
+                    print("Unsupported version", element.get("version"))
+                elif len(elements) == 1 and \
+                        element.tag not in ['evidences', 'include']:
+                    print("Unknown element disamparsulations:",
+                          element.tag)
+                    exit(2)
+                elif len(elements) == 2 and element.tag != 'evidence':
+                    print("Unknown element in evidences:", element.tag)
+                    exit(2)
+                if element.tag == 'documentation':
+                    documentations += 1
+                elements.append(element)
+                continue
+            elements.pop()
+            if element.tag == 'documentation':
+                documentations -= 1
+                element.clear()
+            elif documentations:
+                element.clear()
+            elif len(elements) == 1 and element.tag == 'include':
+                href = element.get('href')
+                if filename:
+                    href = os.path.join(os.path.dirname(filename), href)
+                self.stream_disamparsulations(href, included)
+                elements[-1].remove(element)
+            elif len(elements) == 2 and element.tag == 'evidence':
+                self.rules.append(self.parse_evidence(element))
+                elements[-1].remove(element)
 
-    def parse_evidences(self, evidences: Element):
-        for child in evidences:
-            if child.tag == 'evidence':
-                e = self.parse_evidence(child)
-                self.rules.append(e)
+    def freeze(self):
+        '''Make the loaded grammar immutable and hide it from the GC.
+
+        Rule and matcher lists become tuples, matcher ufeats read-only
+        mappings and all objects alive now are moved into the permanent GC
+        generation, so that processes forked after this do not write to the
+        pages of the grammar when collecting garbage and share them
+        copy-on-write. Evidences and their context dicts are only frozen
+        from the GC, and the target cache keeps filling in each process.
+        '''
+        if self.frozen:
+            return
+        self.rules = tuple(self.rules)
+        for target, ruleids in self.targetrules.items():
+            self.targetrules[target] = tuple(ruleids)
+        self.reweighing = frozenset(self.reweighing)
+        for matcher in self.matcherbits:
+            matcher.freeze()
+        self.frozen = True
+        gc.collect()
+        gc.freeze()
+
+    def optimise(self):
+        '''Fuse identical matchers and flag evidences that cannot fire.
+
+        Evidences that share a matcher object also share its match results
+        while linguisticating, see Evidence.apply.
+        '''
+        matchers = dict()
+        signatures = dict()
+        for rule in self.rules:
+            rule.target = self.fuse_matcher(rule.target, matchers)
+            for part in ['matcher', 'barrier']:
+                if part in rule.context:
+                    rule.context[part] = self.fuse_matcher(rule.context[part],
+                                                           matchers)
+            problem = rule.why_never_fires()
+            if problem:
+                print("Evidence", rule.name, "can never fire:", problem)
+            signature = rule.signature()
+            if signature in signatures:
+                print("Evidence", rule.name, "duplicates",
+                      signatures[signature])
             else:
-                print("Unknown element in evidences:", child.tag)
-                exit(2)
+                signatures[signature] = rule.name
+        self.compile_matchers()
+
+    def compile_matchers(self):
+        '''Compile matchers of all rules into decision tree and number them
+        for reading bitmaps.'''
+        self.targetrules = dict()
+        self.matcherbits = dict()
+        self.reweighing = set()
+        for i, rule in enumerate(self.rules):
+            self.targetrules.setdefault(rule.target, list()).append(i)
+            if rule.only_reweighs_others():
+                self.reweighing.add(i)
+            for matcher in [rule.target, rule.context.get('matcher'),
+                            rule.context.get('barrier')]:
+                if matcher is not None and matcher not in self.matcherbits:
+                    self.matcherbits[matcher] = 1 << len(self.matcherbits)
+        self.tree.compile(list(self.matcherbits))
+        self.targetcache = TargetCache(self.tree, set(self.targetrules),
+                                       self.matcherbits)
+
+    def fingerprint(self):
+        '''Hash of everything in the rules that affects the output.'''
+        hashed = sha1()
+        for rule in self.rules:
+            hashed.update(repr(rule.signature()).encode('utf-8'))
+        return hashed.hexdigest()
+
+    def fuse_matcher(self, matcher: Matcher, matchers: dict):
+        '''Find shared matcher equal to given one.'''
+        return matchers.setdefault(matcher.signature(), matcher)
 
     def parse_evidence(self, evidence: Element):
         '''Parse evidence element block.'''
@@ -84,14 +221,22 @@ class Disamparsulator:
                 upos = self.parse_upos(child)
                 m.uposes.append(upos)
             elif child.tag == 'lemma':
-                ufeats = self.parse_lemma(child)
-                m.lemmas.append(ufeats)
+                kind, lemma = self.parse_lemma(child)
+                if kind == 'exact':
+                    m.lemmas.append(lemma)
+                else:
+                    m.lemmapatterns.append((kind, lemma))
             elif child.tag == 'ufeats':
                 ufeats = self.parse_ufeats(child)
                 m.ufeatses.append(ufeats)
             else:
                 print("Unknown element under target:",
                       xml.etree.ElementTree.tostring(child))
+        try:
+            m.compile_lemmas()
+        except re.error as e:
+            print("Invalid lemma regex:", e)
+            exit(2)
         return m
 
     def parse_likelihood(self, likelihood: Element):
@@ -142,8 +287,14 @@ class Disamparsulator:
         return upos.text
 
     def parse_lemma(self, lemma: Element):
-        '''Parse upos element.'''
-        return lemma.text
+        '''Parse lemma element into kind of match and lemma or pattern.'''
+        kind = lemma.get('match', 'exact')
+        if kind != 'exact' and kind != 'regex' and kind not in LEMMAPATTERNS:
+            print("Unknown lemma match:", kind)
+            exit(2)
+        if kind == 'exact':
+            return kind, lemma.text
+        return kind, lemma.text or ''
 
     def parse_location(self, location: Element):
         '''Parse location element.'''
@@ -177,25 +328,146 @@ class Disamparsulator:
         return m
 
     def linguisticate(self, sentence: list):
-        '''Not a parsing function.'''
+        '''Not a parsing function.
+
+        Returns:
+            dict of counts of overruns of budget, unambiguous tokens
+            skipping rules and rules skipped in the sentence.
+        '''
+        start = perf_counter() if HOOKS else None
         # for each token for each rule apply
+        state = ParseState(sentence, self.targetcache)
+        memstats = self.memstats
+        if memstats:
+            memstats.start_sentence(sentence)
+        skipped_tokens = 0
+        skipped_rules = 0
+        deadline = None
+        if self.time_budget:
+            deadline = perf_counter() + self.time_budget
+        ops = 0
+        overrun = None
+        # position of token whose rules went over budget
+        overpos = 0
+        for token in sentence.tokens:
+            state.start_token()
+            # new analyses added by rules are copies that classify the same
+            # so rules not matching now will never match this token
+            ruleids = set()
+            for analysis in token.analyses:
+                for target in state.targets(analysis):
+                    ruleids.update(self.targetrules[target])
+            if len(token.analyses) == 1 and ruleids & self.reweighing:
+                skipped_tokens += 1
+            for i in sorted(ruleids):
+                if i in self.reweighing and len(token.analyses) == 1:
+                    # until rules add copies there is nothing to reweigh
+                    skipped_rules += 1
+                    continue
+                if deadline and perf_counter() > deadline:
+                    overrun = 'time'
+                    break
+                elif self.op_budget and ops >= self.op_budget:
+                    overrun = 'operations'
+                    break
+                analyses = len(token.analyses)
+                if memstats:
+                    memstats.apply(self.rules[i], token, sentence, state)
+                else:
+                    self.rules[i].apply(token, sentence, state)
+                # each application and each hypothesis it adds
+                ops += 1 + len(token.analyses) - analyses
+            if overrun:
+                overpos = token.pos
+                break
+            if self.prune(token):
+                state.changed(token)
+        if overrun:
+            sentence.comments.append("budget_exceeded = " + overrun)
+            self.degrade(sentence, overpos)
+        else:
+            self.fix_roots(sentence)
+        if start is not None:
+            emit('linguisticate', sentence.location, start,
+                 tokens=len(sentence.tokens),
+                 analyses=sum(len(t.analyses) for t in sentence.tokens),
+                 operations=ops, overrun=overrun or '')
+        if memstats:
+            memstats.end_sentence(sentence)
+        return {'overruns': 1 if overrun else 0,
+                'skipped_tokens': skipped_tokens,
+                'skipped_rules': skipped_rules}
+
+    def linguisticate_reference(self, sentence: list):
+        '''Linguisticate by trying every rule on every token from scratch.
+
+        Slow but simple, for checking that linguisticate gives same results.
+        '''
         for token in sentence.tokens:
             for rule in self.rules:
                 rule.apply(token, sentence)
-            # some things can be pruned
-            cleanups = list()
-            for analysis in token.analyses:
-                if not analysis.udepname:
-                    analysis.weight += 500
-                    cleanups.append(analysis)
-            if len(cleanups) < len(token.analyses):
-                for cleanup in cleanups:
-                    for analysis in token.analyses:
-                        if analysis.upos == cleanup.upos and \
-                                analysis.ufeats == cleanup.ufeats and \
-                                analysis.udepname:
-                            token.analyses.remove(cleanup)
-                            break
+            self.prune(token)
+        self.fix_roots(sentence)
+
+    def degrade(self, sentence: list, first: int):
+        '''Finish sentence that went over budget cheaply.
+
+        Tokens from position first on keep only their best analysis. Without
+        a root the first verb or auxiliary, or else the first token, becomes
+        one, and all tokens without deps are attached to the root as dep.
+        '''
+        tokens = [token for token in sentence.tokens if token.analyses]
+        for token in tokens:
+            if token.pos >= first:
+                token.analyses = [token.get_best()]
+        self.fix_roots(sentence)
+        root = None
+        for token in tokens:
+            if token.get_best().udepname == 'root':
+                root = token.pos
+                break
+        if root is None and tokens:
+            roottoken = tokens[0]
+            for token in tokens:
+                if token.get_best().upos in ['VERB', 'AUX']:
+                    roottoken = token
+                    break
+            roottoken.get_best().udepname = 'root'
+            roottoken.get_best().udeppos = 0
+            root = roottoken.pos
+        for token in tokens:
+            analysis = token.get_best()
+            if not analysis.udepname:
+                analysis.udepname = 'dep'
+                analysis.udeppos = root
+
+    def prune(self, token):
+        '''Penalise analyses without deps and drop ones duplicated by
+        analyses with deps.
+
+        Returns:
+            True if any analysis has a dep, i.e. when analyses may have been
+            removed.
+        '''
+        # some things can be pruned
+        cleanups = list()
+        for analysis in token.analyses:
+            if not analysis.udepname:
+                analysis.weight += 500
+                cleanups.append(analysis)
+        if len(cleanups) < len(token.analyses):
+            for cleanup in cleanups:
+                for analysis in token.analyses:
+                    if analysis.upos == cleanup.upos and \
+                            analysis.ufeats == cleanup.ufeats and \
+                            analysis.udepname:
+                        token.analyses.remove(cleanup)
+                        break
+            return True
+        return False
+
+    def fix_roots(self, sentence: list):
+        '''Keep only the best root of sentence.'''
         # we have to pull out multiple roots
         toproot = None
         minweight = float('inf')
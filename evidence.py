@@ -8,10 +8,12 @@ same time. Pay no attention to the man behind the curtains and move along.
 """
 
 from copy import deepcopy
+from time import perf_counter
 # stuff
 
-from token import Token
+from tokens import Token
 from matcher import Matcher
+from tracing import HOOKS, emit
 
 
 class Evidence:
@@ -34,21 +36,29 @@ class Evidence:
         # inf: nearly never (ungrammatical, CG REMOVE)
         self.unlikelihood = -1.0
 
-    def apply(self, token: Token, sentence: list):
-        '''If suggestion applies to token in context.'''
+    def apply(self, token: Token, sentence: list, state=None):
+        '''If suggestion applies to token in context.
+
+        State is the ParseState of the sentence, it remembers matches shared
+        between evidences. Without it everything is matched from scratch.
+        Evidence itself is not modified so it can be applied in many threads.
+
+        Returns:
+            number of analyses copied, including copies then dropped as
+            duplicates.
+        '''
+        start = perf_counter() if HOOKS else None
         newdeps = list()
         for analysis in token.analyses:
             matched = True
-            if not self.target.matches(analysis):
+            if not self.target_matches(analysis, state):
                 matched = False
                 continue
             else:
-                agrs = self.target.get_agreement_ufeats(analysis)
-                if 'matcher' in self.context:
-                    self.context['matcher'].agrs = agrs
+                agrs = self.agreements(analysis, state)
             heads = []
             if self.context:
-                heads = self.find_context(token, sentence)
+                heads = self.find_context(token, sentence, agrs, state)
                 if not heads:
                     matched = False
             if matched and "negated" not in self.context and not self.depname:
@@ -74,9 +84,10 @@ class Evidence:
                         distance = 0
                     if distance == 0:
                         distance = 1
-                    barriers = self.count_barriers(token, sentence, head)
-                    magic = (distance * 0.1) / (barriers + 1)
-                    magic2 = (distance * 0.01) / (barriers + 1)
+                    blockers = self.count_barriers(token, sentence, head,
+                                                   state)
+                    magic = (distance * 0.1) / (blockers + 1)
+                    magic2 = (distance * 0.01) / (blockers + 1)
                     if self.depname and not analysis.udepname:
                         newdep = deepcopy(analysis)
                         newdep.udepname = self.depname
@@ -106,28 +117,127 @@ class Evidence:
             if addkey not in addeds:
                 token.analyses.append(anal)
                 addeds.add(addkey)
+        if addeds and state:
+            state.changed(token)
+        if start is not None:
+            emit('apply', sentence.location, start, rule=self.name,
+                 token=token.pos, added=len(addeds))
+        return len(newdeps)
+
+    def target_matches(self, analysis, state=None):
+        '''Check if target matches analysis, using state if given.'''
+        if state is None:
+            return self.target.matches(analysis)
+        return self.target in state.targets(analysis)
+
+    def agreements(self, analysis, state=None):
+        '''Get agreement ufeats bound by target matching analysis.'''
+        if state is None:
+            return self.target.get_agreement_ufeats(analysis)
+        return state.agreements(analysis, self.target)
 
-    def find_context(self, target: Token, sentence: list):
-        '''Traverse sentence to find contexts that match.'''
+    def find_context(self, target: Token, sentence: list, agrs=None,
+                     state=None):
+        '''Traverse sentence to find contexts that match.
+
+        Agrs are agreement ufeats bound by target.
+        '''
         if self.context['location'] == 'ROOT':
             return [{"pos": 0, "a": None}]
+        key = None
+        if state is not None and not self.is_self_context():
+            # other tokens do not change while target is being processed
+            key = self.context_key(agrs)
+            if key in state.memo:
+                return state.memo[key]
         heads = list()
         for head in sentence.tokens:
             if self.in_context(target, sentence, head):
                 for analysis in head.analyses:
                     matched = True
-                    if 'matcher' not in self.context:
+                    matcher = self.context.get('matcher')
+                    if not matcher:
                         pass
-                    elif not self.context['matcher'].matches(analysis):
+                    elif state is None:
+                        matched = matcher.matches(analysis, agrs)
+                    elif not state.matches(matcher, analysis, agrs):
                         matched = False
                     if matched:
                         heads.append({"pos": head.pos, "a": analysis})
+        if key is not None:
+            state.memo[key] = heads
         return heads
 
-    def count_barriers(self, target: Token, sentence: list, head: Token):
-        '''Count how many barriers are between token target and head if any.'''
+    def context_key(self, agrs=None):
+        '''Key for context scans that find same heads for same target.'''
+        if 'matcher' not in self.context:
+            return 'context', self.context['location'], None, ()
+        return 'context', self.context['location'], \
+            id(self.context['matcher']), \
+            tuple(sorted(agrs.items())) if agrs else ()
+
+    def is_self_context(self):
+        '''Check if context location can point to target itself.'''
+        location = self.context['location']
+        if location.isdigit() or location[0] in '+-' and \
+                location[1:].isdigit():
+            return int(location) == 0
+        return False
+
+    def signature(self):
+        '''Hashable summary of the evidence for finding duplicates.'''
+        context = None
+        if self.context:
+            context = ('negated' in self.context,
+                       self.context.get('location'),
+                       self.context['matcher'].signature()
+                       if 'matcher' in self.context else None,
+                       self.context['barrier'].signature()
+                       if 'barrier' in self.context else None)
+        return (self.target.signature(), self.unlikelihood,
+                self.depname or None, context)
+
+    def why_never_fires(self):
+        '''Statically check if evidence can never apply to anything.
+
+        Returns:
+            string describing the problem or None if evidence can fire.
+        '''
+        if not self.target.is_satisfiable():
+            return "target matches no UPOS that analyses can have"
+        if self.depname and not self.context:
+            return "depname without context"
+        if not self.context:
+            return None
+        if 'location' not in self.context:
+            return "context without location"
+        location = self.context['location']
+        if location not in ['ROOT', 'left', 'right', 'any'] and \
+                not location.isdigit() and \
+                not (location[0] in '+-' and location[1:].isdigit()):
+            return "broken context location " + location
+        if 'negated' not in self.context and 'matcher' in self.context and \
+                not self.context['matcher'].is_satisfiable():
+            return "context matches no UPOS that analyses can have"
+        return None
+
+    def only_reweighs_others(self):
+        '''Check if evidence can only change weights of analyses other than
+        the one it matches, so it does nothing to a token with one analysis.
+        '''
+        return not self.depname and self.unlikelihood <= 0
+
+    def count_barriers(self, target: Token, sentence: list, head: Token,
+                       state=None):
+        '''Count how many barriers are between token target and head if any.
+
+        If state is given, counts are read from its BarrierCounts.
+        '''
         if 'barrier' not in self.context:
             return 0
+        if state is not None:
+            counts = state.barrier_counts(self.context['barrier'])
+            return counts.outside(head['pos'], target.pos)
         # I cannot be bothered to deal with context direction blah here...
         left = min(head['pos'], target.pos)
         right = max(head['pos'], target.pos)
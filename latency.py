@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Per-sentence processing time statistics.
+"""
+
+import heapq
+from array import array
+
+# upper limits of sentence length buckets in tokens, last one is open
+BUCKETS = [10, 20, 40, 80, 160]
+
+
+class LatencyStats:
+    """Latency percentiles by sentence length and the slowest sentences."""
+
+    def __init__(self, slow=20):
+        """Create empty statistics remembering slow slowest sentences."""
+        self.times = [array('d') for _ in range(len(BUCKETS) + 1)]
+        self.slow = slow
+        # heap of (seconds, sentid, tokens) of slowest sentences
+        self.slowest = list()
+
+    def record(self, sentid: str, tokens: int, seconds: float):
+        '''Record sentence sentid of tokens taking seconds.'''
+        bucket = 0
+        while bucket < len(BUCKETS) and tokens > BUCKETS[bucket]:
+            bucket += 1
+        self.times[bucket].append(seconds)
+        if len(self.slowest) < self.slow:
+            heapq.heappush(self.slowest, (seconds, sentid, tokens))
+        elif self.slowest and seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (seconds, sentid, tokens))
+
+    def report(self, f):
+        '''Print p50, p90, p99 and max in milliseconds by length to f.'''
+        lower = 1
+        for bucket, times in enumerate(self.times + [None]):
+            if times is None:
+                label = "all"
+                times = array('d')
+                for bucket_times in self.times:
+                    times.extend(bucket_times)
+            elif bucket < len(BUCKETS):
+                label = str(lower) + "-" + str(BUCKETS[bucket])
+                lower = BUCKETS[bucket] + 1
+            else:
+                label = str(lower) + "-"
+            if not times:
+                continue
+            times = sorted(times)
+            print("Latency ms for", label, "tokens:", len(times),
+                  "sentences, p50", percentile(times, 50) * 1000,
+                  "p90", percentile(times, 90) * 1000,
+                  "p99", percentile(times, 99) * 1000,
+                  "max", times[-1] * 1000, file=f)
+
+    def write_slow(self, f):
+        '''Write slowest sentences, slowest first, as seconds, tokens and
+        sentence id separated by tabs.'''
+        for seconds, sentid, tokens in sorted(self.slowest, reverse=True):
+            print(seconds, tokens, sentid, sep='\t', file=f)
+
+
+def percentile(times, p: int):
+    '''Get pth percentile of sorted times by nearest rank.'''
+    rank = max(0, -(-len(times) * p // 100) - 1)
+    return times[rank]
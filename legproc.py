@@ -11,72 +11,185 @@ from sys import stdin, stdout
 from time import perf_counter, process_time
 
 from disamparsulator import Disamparsulator
-from sentence import Sentence
+from latency import LatencyStats
+from memstats import MemoryStats
+from pipeline import Pipeline
+from sentencecache import SentenceCache
+from batch import expand_inputs, run_batch
+from compressed import is_compressed, open_input, open_output
+from shards import merge_shards, run_shards
+from tracing import ChromeTrace, add_hook
 
 
 def main():
     """Invoke a simple CLI analyser."""
     a = ArgumentParser()
-    a.add_argument('-i', '--input', metavar="INFILE", type=open,
-                   dest="infile", help="source of analysis data")
+    a.add_argument('-i', '--input', metavar="INFILE", action='append',
+                   dest="inputs", default=[],
+                   help="source of analysis data, can be repeated or a glob")
+    a.add_argument('--input-list', metavar="LISTFILE", action='append',
+                   default=[], help="read input paths from LISTFILE")
+    a.add_argument('--output-dir', metavar="DIR",
+                   help="write each input into its own file in DIR")
+    a.add_argument('-j', '--jobs', metavar="N", type=int, default=1,
+                   help="convert N inputs in parallel with --output-dir")
     a.add_argument('-v', '--verbose', action='store_true',
                    help="print verbosely while processing")
     a.add_argument('-o', '--output', metavar="OUTFILE", dest="outfile",
-                   help="print output into OUTFILE", type=FileType('w'))
+                   help="print output into OUTFILE, compressed if it ends "
+                   "in .gz, .bz2 or .xz", type=open_output)
     a.add_argument('-x', '--statistics', metavar="STATFILE", dest="statfile",
                    help="print statistics to STATFILE", type=FileType('w'))
     a.add_argument('--not-rules', metavar="RULEFILE", type=open, required=True,
-                   help="read non-rules from RULEFILE")
+                   action='append',
+                   help="read non-rules from RULEFILE, can be repeated")
     a.add_argument('--giella', default=False, action='store_true',
                    help="use giella instead of ape parsing")
+    a.add_argument('-f', '--input-format', default='ape',
+                   choices=['ape', 'hfst-lookup', 'cg3'],
+                   help="read apertium stream, hfst-lookup output or "
+                   "VISL CG 3 text format, the latter two with giella tags")
+    a.add_argument('-F', '--output-format', default='conllu',
+                   choices=['conllu', 'columnar', 'lattice'],
+                   help="print CONLL-U, write binary columnar file or print "
+                   "all hypotheses as JSON lines")
     a.add_argument('--debug', action='store_true',
                    help="print lots of debug info while processing")
+    a.add_argument('--cache-size', metavar="N", type=int, default=0,
+                   help="remember output of N most recent distinct lines")
+    a.add_argument('--cache-file', metavar="DBMFILE",
+                   help="store remembered output in DBMFILE across runs")
+    a.add_argument('--memory-stats', metavar="N", type=int, default=0,
+                   help="trace memory and list N most memory-hungry "
+                   "sentences and rules in statistics")
+    a.add_argument('--latency', action='store_true',
+                   help="add sentence latency percentiles to statistics")
+    a.add_argument('--slow-log', metavar="LOGFILE", type=FileType('w'),
+                   help="write ids of slowest sentences to LOGFILE")
+    a.add_argument('--slow-count', metavar="N", type=int, default=20,
+                   help="number of sentences in slow log")
+    a.add_argument('--segment', action='store_true',
+                   help="split lines into sentences at final punctuation")
+    a.add_argument('--max-length', metavar="N", type=int, default=0,
+                   help="split sentences longer than N tokens")
+    a.add_argument('--time-budget', metavar="SECONDS", type=float, default=0,
+                   help="finish sentences taking longer cheaply")
+    a.add_argument('--op-budget', metavar="N", type=int, default=0,
+                   help="finish sentences needing more rule operations "
+                   "cheaply")
+    a.add_argument('--trace', metavar="TRACEFILE", type=FileType('w'),
+                   help="write Chrome trace event JSON of all stages")
+    a.add_argument('--threads', metavar="N", type=int, default=1,
+                   help="linguisticate in N threads sharing the rules")
+    a.add_argument('--shards', metavar="N", type=int, default=0,
+                   help="convert INFILE in N resumable shards")
+    a.add_argument('--shard-dir', metavar="DIR",
+                   help="keep shards and their manifest in DIR")
     options = a.parse_args()
     if options.verbose:
         print("Printing verbosely")
     disamparsulator = Disamparsulator()
     if options.not_rules:
         if options.verbose:
-            print("Loading", options.not_rules)
-        disamparsulator.frobblesnizz(options.not_rules)
+            print("Loading", *[f.name for f in options.not_rules])
+        disamparsulator.frobblesnizz(*options.not_rules)
     else:
         print("Disamparsulate must frobblesnizz")
         exit(4)
-    if not options.infile:
+    paths = expand_inputs(options.inputs, options.input_list)
+    if not paths:
         print("reading from <stdin>")
-        options.infile = stdin
     if options.verbose:
-        print("analysing", options.infile.name)
+        print("analysing", *paths if paths else [stdin.name])
+    disamparsulator.time_budget = options.time_budget
+    disamparsulator.op_budget = options.op_budget
     if not options.outfile:
         options.outfile = stdout
     if options.verbose:
         print("writing to", options.outfile.name)
     if not options.statfile:
         options.statfile = stdout
+    cache = None
+    if options.cache_file and not options.cache_size:
+        options.cache_size = 10000
+    if options.output_format != 'conllu':
+        if options.debug or options.cache_size:
+            print("Only CONLL-U output supports --debug or caching")
+            exit(1)
+    if options.cache_size:
+        cache = SentenceCache(disamparsulator.fingerprint(),
+                              options.cache_size, options.cache_file)
+    latency = None
+    if options.latency or options.slow_log:
+        if options.jobs > 1 or options.shards:
+            print("Latency is not measured with --jobs or --shards")
+            exit(1)
+        latency = LatencyStats(options.slow_count)
+    pipeline = Pipeline(disamparsulator, options.input_format,
+                        options.output_format, options.giella,
+                        options.debug, cache, options.threads, latency,
+                        options.segment, options.max_length)
+    if options.jobs > 1 and (not options.output_dir or cache):
+        print("--jobs needs --output-dir and no caching")
+        exit(1)
+    if options.output_dir and not paths:
+        print("--output-dir needs --input")
+        exit(1)
+    if options.output_format == 'columnar' and len(paths) > 1 and \
+            not options.output_dir:
+        print("Columnar output of many inputs needs --output-dir")
+        exit(1)
+    if options.memory_stats:
+        if options.threads > 1 or options.jobs > 1:
+            print("--memory-stats works only in one thread")
+            exit(1)
+        disamparsulator.memstats = MemoryStats()
+    if options.shards:
+        if len(paths) != 1 or options.output_dir or not options.shard_dir or \
+                options.input_format != 'ape' or is_compressed(paths[0]) or \
+                options.output_format != 'conllu':
+            print("Shards need one uncompressed --input, --shard-dir and "
+                  "ape to CONLL-U")
+            exit(1)
 
+    trace = None
+    if options.trace:
+        if options.jobs > 1:
+            print("--trace works only without --jobs")
+            exit(1)
+        trace = ChromeTrace(options.trace)
+        add_hook(trace)
     # statistics
     realstart = perf_counter()
     cpustart = process_time()
     tokens = 0
     unknowns = 0
     sentences = 0
-    for line in options.infile:
-        sent = {'text': None}
-        if options.giella:
-            sent = Sentence.fromapeline(line.strip(), reformat="giella")
-        else:
-            sent = Sentence.fromapeline(line.strip())
-        if sent.text:
-            sentences += 1
-            sent.id = options.infile.name + "." + str(sentences)
-            disamparsulator.linguisticate(sent)
-            if not options.debug:
-                print(sent.printable_conllu(), file=options.outfile)
-            else:
-                print("DEBG")
-                print(sent.printable_ambigonllu(), file=options.outfile)
+    if options.shards:
+        manifest = run_shards(pipeline, paths[0], paths[0],
+                              options.shard_dir, options.shards,
+                              options.verbose)
+        sentences = merge_shards(manifest, paths[0], options.shard_dir,
+                                 options.outfile)
+    elif paths:
+        suffix = {'conllu': '.conllu', 'columnar': '.col',
+                  'lattice': '.jsonl'}[options.output_format]
+        sentences = run_batch(pipeline, paths, options.output_dir,
+                              options.outfile, suffix, options.jobs,
+                              options.verbose)
+    else:
+        sentences = pipeline.run(open_input(stdin.name, stdin.buffer),
+                                 stdin.name, options.outfile)
+    if options.outfile != stdout:
+        options.outfile.close()
+    if trace:
+        trace.close()
+    if cache:
+        cache.close()
     cpuend = process_time()
     realend = perf_counter()
+    if len(paths) > 1:
+        print("Files:", len(paths), file=options.statfile)
     print("Tokens:", tokens, "Sentences:", sentences,
           file=options.statfile)
     print("Unknowns / OOV:", unknowns, "=",
@@ -88,6 +201,26 @@ def main():
           file=options.statfile)
     print("Sentences per timeunit:", sentences / (realend - realstart),
           file=options.statfile)
+    if latency:
+        latency.report(options.statfile)
+    if options.slow_log:
+        latency.write_slow(options.slow_log)
+    if disamparsulator.memstats:
+        disamparsulator.memstats.report(options.statfile,
+                                        options.memory_stats)
+    if options.time_budget or options.op_budget:
+        print("Sentences over budget:", pipeline.counts['overruns'],
+              file=options.statfile)
+    print("Unambiguous tokens skipping rules:",
+          pipeline.counts['skipped_tokens'], "Rules skipped:",
+          pipeline.counts['skipped_rules'], file=options.statfile)
+    if options.verbose:
+        print("Target cache hits:", disamparsulator.targetcache.hits,
+              "misses:", disamparsulator.targetcache.misses,
+              file=options.statfile)
+    if cache:
+        print("Cache hits:", cache.hits, "misses:", cache.misses,
+              file=options.statfile)
     exit(0)
 
 
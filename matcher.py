@@ -7,7 +7,13 @@ Beta-testing a wack idea of not disambiguating and dependency parsing at the
 same time. Pay no attention to the man behind the curtains and move along.
 """
 
-from analysis import Analysis
+import re
+from types import MappingProxyType
+
+from analysis import Analysis, UPOSES
+
+# kind of lemma pattern => regex template for the escaped pattern
+LEMMAPATTERNS = {'prefix': '{}.*', 'suffix': '.*{}', 'compound': '.*#{}'}
 
 
 class Matcher:
@@ -17,17 +23,24 @@ class Matcher:
         self.uposes = list()
         self.ufeatses = list()
         self.lemmas = list()
-        self.agrs = dict()
+        # (kind, pattern) pairs for lemmas not matched exactly
+        self.lemmapatterns = list()
+        # compiled by compile_lemmas, lemmaset is None until then
+        self.lemmaset = None
+        self.lemmaregex = None
 
-    def matches(self, analysis: Analysis):
-        """Checks if token matches given params."""
-        if self.lemmas:
-            found = False
-            for lemma in self.lemmas:
-                if '#'.join(analysis.lemmas) == lemma:
-                    found = True
-                    break
-            if not found:
+    def matches(self, analysis: Analysis, agrs=None):
+        """Checks if token matches given params.
+
+        Agrs are agreement ufeats that analysis must have same values for,
+        if they are in the matcher.
+        """
+        if self.lemmas or self.lemmapatterns:
+            if self.lemmaset is None:
+                self.compile_lemmas()
+            lemma = '#'.join(analysis.lemmas)
+            if lemma not in self.lemmaset and \
+                    not (self.lemmaregex and self.lemmaregex.fullmatch(lemma)):
                 return False
         if self.uposes:
             found = False
@@ -46,8 +59,8 @@ class Matcher:
                         foundall = False
                         break
                     elif self.is_ufeat_agreement(feat):
-                        if feat in self.agrs and \
-                                self.agrs[feat] != analysis.ufeats[feat]:
+                        if agrs and feat in agrs and \
+                                agrs[feat] != analysis.ufeats[feat]:
                             foundall = False
                             break
                         else:
@@ -63,6 +76,57 @@ class Matcher:
                 return False
         return True
 
+    def signature(self):
+        """Hashable summary of everything this matcher checks."""
+        return (tuple(self.lemmas) + tuple(self.lemmapatterns),
+                tuple(self.uposes),
+                tuple(tuple(sorted(ufeats.items()))
+                      for ufeats in self.ufeatses))
+
+    def compile_lemmas(self):
+        """Compile lemmas into a set and lemma patterns into one regex.
+
+        Must be called again if lemmas are changed after matching with
+        this. Raises re.error for invalid regex patterns.
+        """
+        alternatives = list()
+        for kind, pattern in self.lemmapatterns:
+            if kind == 'regex':
+                alternatives.append('(?:' + pattern + ')')
+            else:
+                alternatives.append(LEMMAPATTERNS[kind].format(
+                    re.escape(pattern)))
+        if alternatives:
+            self.lemmaregex = re.compile('|'.join(alternatives), re.DOTALL)
+        else:
+            self.lemmaregex = None
+        # last, so that other threads never see half compiled lemmas
+        self.lemmaset = frozenset(self.lemmas)
+
+    def is_satisfiable(self):
+        """Checks if any analysis could ever match this."""
+        if self.uposes:
+            for upos in self.uposes:
+                if upos in UPOSES:
+                    return True
+            return False
+        return True
+
+    def freeze(self):
+        """Make matcher read-only when nothing is added any more."""
+        self.uposes = tuple(self.uposes)
+        self.ufeatses = tuple(MappingProxyType(ufeats)
+                              for ufeats in self.ufeatses)
+        self.lemmas = tuple(self.lemmas)
+        self.lemmapatterns = tuple(self.lemmapatterns)
+
+    def has_agreement(self):
+        """Checks if any ufeat is unified with the target."""
+        for ufeats in self.ufeatses:
+            if "*AGREEMENT*" in ufeats.values():
+                return True
+        return False
+
     def is_ufeat_agreement(self, feat):
         for ufeats in self.ufeatses:
             if feat in ufeats:
@@ -86,6 +150,9 @@ class Matcher:
     def __str__(self):
         s = '"omorfi.disamparsulate.Matcher: {'
         s += '"lemmas": [' + ', '.join(self.lemmas) + '], '
+        s += '"lemmapatterns": [' + ', '.join(
+            kind + ':' + pattern for kind, pattern in self.lemmapatterns)
+        s += '], '
         s += '"uposes": [' + ', '.join(self.uposes) + '], '
         s += '"ufeatses": ['
         for ufeats in self.ufeatses:
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Measuring memory used by hypotheses while linguisticating.
+
+Disamparsulator calls MemoryStats around each sentence and rule application
+when its memstats is set, otherwise nothing is measured. Memory is traced
+with tracemalloc, so the numbers are only meaningful in one thread.
+"""
+
+import tracemalloc
+from collections import defaultdict
+
+
+class MemoryStats:
+    """Per sentence and per rule memory and hypothesis counts."""
+
+    def __init__(self):
+        """Start tracing memory allocations."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        # one dict per sentence
+        self.sentences = list()
+        self.current = None
+        # rule name => [applications, copies made, copies kept, bytes grown]
+        self.rules = defaultdict(lambda: [0, 0, 0, 0])
+
+    def start_sentence(self, sentence):
+        '''Start measuring linguistication of sentence.'''
+        tracemalloc.reset_peak()
+        self.current = {'location': sentence.location,
+                        'tokens': len(sentence.tokens),
+                        'before': sum(len(token.analyses)
+                                      for token in sentence.tokens),
+                        'copies': 0,
+                        'kept': 0,
+                        'start': tracemalloc.get_traced_memory()[0]}
+
+    def apply(self, rule, token, sentence, state):
+        '''Apply rule to token measuring copies and memory it adds.'''
+        before = len(token.analyses)
+        memory = tracemalloc.get_traced_memory()[0]
+        copies = rule.apply(token, sentence, state)
+        kept = len(token.analyses) - before
+        stats = self.rules[rule.name]
+        stats[0] += 1
+        stats[1] += copies
+        stats[2] += kept
+        stats[3] += tracemalloc.get_traced_memory()[0] - memory
+        self.current['copies'] += copies
+        self.current['kept'] += kept
+
+    def end_sentence(self, sentence):
+        '''Finish measuring sentence.'''
+        current = self.current
+        current['after'] = sum(len(token.analyses)
+                               for token in sentence.tokens)
+        current['peak'] = tracemalloc.get_traced_memory()[1] - \
+            current.pop('start')
+        self.sentences.append(current)
+        self.current = None
+
+    def report(self, f, top=10):
+        '''Print summary and top memory-hungry sentences and rules to f.'''
+        if not self.sentences:
+            return
+        tokens = sum(s['tokens'] for s in self.sentences)
+        print("Analyses per token before rules:",
+              sum(s['before'] for s in self.sentences) / max(tokens, 1),
+              "after:", sum(s['after'] for s in self.sentences) /
+              max(tokens, 1), file=f)
+        print("Copied hypotheses:", sum(s['copies'] for s in self.sentences),
+              "kept:", sum(s['kept'] for s in self.sentences),
+              "Max peak bytes:", max(s['peak'] for s in self.sentences),
+              file=f)
+        print("Top", top, "sentences by peak bytes:", file=f)
+        for s in sorted(self.sentences, key=lambda s: s['peak'],
+                        reverse=True)[:top]:
+            print("", s['peak'], "bytes,", s['tokens'], "tokens,",
+                  s['before'], "->", s['after'], "analyses,", s['copies'],
+                  "copies,", s['kept'], "kept:", s['location'], file=f)
+        print("Top", top, "rules by bytes grown:", file=f)
+        for name, stats in sorted(self.rules.items(),
+                                  key=lambda item: item[1][3],
+                                  reverse=True)[:top]:
+            print("", stats[3], "bytes,", stats[1], "copies,", stats[2],
+                  "kept in", stats[0], "applications:", name, file=f)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+State of linguisticating one sentence.
+
+Everything that changes while a sentence is linguisticated lives here, rules
+and matchers of the grammar are only read, so one grammar can be shared by
+threads each working on their own sentence.
+"""
+
+from analysis import Analysis
+from matcher import Matcher
+from targetcache import TargetCache
+from tokens import Token
+
+
+class ParseState:
+    """Memos, reading bitmaps and counts for one sentence under
+    linguistication."""
+
+    def __init__(self, sentence, cache: TargetCache):
+        """Create state for sentence looking readings up in cache.
+
+        Every reading of the sentence is looked up at once, giving the
+        bitmap of matchers it satisfies.
+        """
+        self.sentence = sentence
+        self.cache = cache
+        # per token memo of context scans
+        self.memo = dict()
+        # id of analysis => analysis and its cache entry
+        self.readings = dict()
+        # barrier matcher => BarrierCounts
+        self.barriers = dict()
+        for token in sentence.tokens:
+            for analysis in token.analyses:
+                self.lookup(analysis)
+
+    def start_token(self):
+        '''Forget memos of previous token before applying rules to next.'''
+        self.memo = dict()
+
+    def lookup(self, analysis: Analysis):
+        '''Get targets, their agreement ufeats and matcher bitmap of
+        analysis.'''
+        reading = self.readings.get(id(analysis))
+        if reading is None or reading[0] is not analysis:
+            # keeping analysis keeps its id unique while in the sentence
+            reading = analysis, self.cache.lookup(analysis)
+            self.readings[id(analysis)] = reading
+        return reading[1]
+
+    def targets(self, analysis: Analysis):
+        '''Get target matchers that match analysis.'''
+        return self.lookup(analysis)[0]
+
+    def agreements(self, analysis: Analysis, target: Matcher):
+        '''Get agreement ufeats that target matching analysis binds.'''
+        return self.lookup(analysis)[1][target]
+
+    def matches(self, matcher: Matcher, analysis: Analysis, agrs=None):
+        '''Same as matcher.matches(analysis, agrs) from reading bitmap.'''
+        bit = self.cache.bits.get(matcher)
+        if bit is None:
+            return matcher.matches(analysis, agrs)
+        if not self.lookup(analysis)[2] & bit:
+            return False
+        if agrs and matcher in self.cache.agreeing:
+            return matcher.matches(analysis, agrs)
+        return True
+
+    def barrier_counts(self, matcher: Matcher):
+        '''Get BarrierCounts of the sentence for barrier matcher.'''
+        if matcher not in self.barriers:
+            self.barriers[matcher] = BarrierCounts(self.sentence, matcher,
+                                                   self.matches)
+        return self.barriers[matcher]
+
+    def changed(self, token: Token):
+        '''Update counts after analyses of token have been changed.'''
+        for counts in self.barriers.values():
+            counts.update(token)
+
+
+class BarrierCounts:
+    """Barrier matches of sentence as prefix sums over token positions.
+
+    Gives same counts as Evidence.count_barriers without a sentence scan. Must
+    be updated whenever analyses of a token change.
+    """
+
+    def __init__(self, sentence, matcher: Matcher, matches=None):
+        """Count matches of barrier matcher in sentence.
+
+        Matches is function of matcher and analysis to match with, by
+        default Matcher.matches.
+        """
+        self.matcher = matcher
+        self.matches = matches or Matcher.matches
+        self.counts = [0] * (max([t.pos for t in sentence.tokens] + [0]) + 1)
+        for token in sentence.tokens:
+            self.counts[token.pos] = self.count(token)
+        self.sums = list()
+        self.summarise(0)
+
+    def count(self, token: Token):
+        '''Count barrier matches in analyses of token.'''
+        matches = 0
+        for anal in token.analyses:
+            if self.matches(self.matcher, anal):
+                matches += 1
+        return matches
+
+    def summarise(self, start: int):
+        '''Recalculate prefix sums from position start on.'''
+        del self.sums[start:]
+        total = self.sums[-1] if self.sums else 0
+        for count in self.counts[start:]:
+            total += count
+            self.sums.append(total)
+
+    def update(self, token: Token):
+        '''Recount after analyses of token have changed.'''
+        count = self.count(token)
+        if count != self.counts[token.pos]:
+            self.counts[token.pos] = count
+            self.summarise(token.pos)
+
+    def outside(self, first: int, second: int):
+        '''Count barrier matches not strictly between two positions.'''
+        left = min(first, second)
+        right = max(first, second)
+        between = 0
+        if right - 1 > left:
+            between = self.sums[right - 1] - self.sums[left]
+        return self.sums[-1] - between
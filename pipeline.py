@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Processing whole input streams from analyser output to CONLL-U.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import perf_counter
+
+from columnar import ColumnarWriter
+from compressed import open_input, open_output
+from disamparsulator import Disamparsulator
+from sentence import Sentence
+from streams import apertium_sentences, cg3_sentences, hfstlookup_sentences
+from tracing import HOOKS, emit
+
+
+class Pipeline:
+    """Reads sentences, linguisticates them and writes them out.
+
+    Same pipeline can process many input files in turn with one loaded
+    grammar. With more than one thread sentences are linguisticated in a
+    thread pool sharing the grammar, output stays in input order.
+    """
+
+    def __init__(self, disamparsulator: Disamparsulator, input_format='ape',
+                 output_format='conllu', giella=False, debug=False,
+                 cache=None, threads=1, latency=None, segment=False,
+                 max_length=0):
+        """Create pipeline for processing with loaded disamparsulator.
+
+        Args:
+            disamparsulator     Disamparsulator with rules loaded
+            input_format        ape, hfst-lookup or cg3
+            output_format       conllu, columnar or lattice
+            giella              ape stream has giella tags
+            debug               print all hypotheses
+            cache               SentenceCache to use if any
+            threads             number of threads to linguisticate in
+            latency             LatencyStats to record sentence times in
+            segment             split lines at sentence-final punctuation
+            max_length          split sentences longer than this many tokens
+        """
+        if cache and output_format != 'conllu':
+            # cache holds printed CONLL-U
+            print("Only CONLL-U output can be cached")
+            exit(1)
+        self.disamparsulator = disamparsulator
+        self.input_format = input_format
+        self.output_format = output_format
+        self.debug = debug
+        self.cache = cache
+        self.threads = threads
+        self.latency = latency
+        self.segment = segment
+        self.max_length = max_length
+        # in cache keys, so that only segmented output is found when
+        # segmenting
+        self.segmenting = dict()
+        if segment or max_length:
+            self.segmenting = {'segment': segment, 'max_length': max_length}
+        # options of parsing ape, the other formats are always giella
+        self.kw = dict()
+        if giella and input_format == 'ape':
+            self.kw['reformat'] = 'giella'
+        if input_format == 'hfst-lookup':
+            self.parser = Sentence.fromhfstlookup
+        elif input_format == 'cg3':
+            self.parser = Sentence.fromcg3
+        else:
+            self.parser = Sentence.fromapeline
+        # statistics over all runs
+        self.sentences = 0
+        self.counts = {'overruns': 0, 'skipped_tokens': 0,
+                       'skipped_rules': 0}
+        self.lock = threading.Lock()
+
+    def lines(self, f):
+        '''Split input file into strings of one sentence each.'''
+        if self.input_format == 'hfst-lookup':
+            return hfstlookup_sentences(f)
+        elif self.input_format == 'cg3':
+            return cg3_sentences(f)
+        else:
+            return apertium_sentences(f)
+
+    def sentences_of(self, line: str, location=""):
+        '''Parse line from location into sentences, segmenting it if asked.'''
+        start = perf_counter() if HOOKS else None
+        sent = self.parser(line.strip(), **self.kw)
+        sent.location = location
+        if start is not None:
+            emit('parse', location, start, tokens=len(sent.tokens))
+        if not sent.text:
+            return []
+        if self.segment or self.max_length:
+            return sent.segment(self.segment, self.max_length)
+        return [sent]
+
+    def linguisticate(self, line: str, location=""):
+        '''Parse and linguisticate sentences of one line of input.
+
+        Can be called from many threads at once.
+
+        Returns:
+            list of linguisticated Sentences without ids.
+        '''
+        sents = self.sentences_of(line, location)
+        for sent in sents:
+            self.count(self.disamparsulator.linguisticate(sent))
+        return sents
+
+    def linguisticate_timed(self, line: str, location=""):
+        '''Linguisticate line measuring how long each sentence takes.
+
+        Returns:
+            list of Sentences and their times in seconds.
+        '''
+        start = perf_counter()
+        timed = list()
+        for sent in self.sentences_of(line, location):
+            self.count(self.disamparsulator.linguisticate(sent))
+            end = perf_counter()
+            timed.append((sent, end - start))
+            start = end
+        return timed
+
+    def settings(self):
+        '''Get options that affect the output as a dict for JSON.'''
+        settings = {'input_format': self.input_format,
+                    'output_format': self.output_format,
+                    'debug': self.debug,
+                    'time_budget': self.disamparsulator.time_budget,
+                    'op_budget': self.disamparsulator.op_budget}
+        settings.update(self.kw)
+        settings.update(self.segmenting)
+        return settings
+
+    def count(self, counts: dict):
+        '''Add counts of one linguistication to statistics.'''
+        with self.lock:
+            for name, count in counts.items():
+                self.counts[name] += count
+
+    def printable(self, sent: Sentence):
+        '''Format sentence for output.'''
+        if not self.debug:
+            return sent.printable_conllu()
+        else:
+            print("DEBG")
+            return sent.printable_ambigonllu()
+
+    def run(self, f, name: str, outfile):
+        '''Process input file f into outfile.
+
+        Sentence ids are name followed by running number of sentence in f.
+        Before that sentences are located by name and number of the line,
+        or of the sentence in hfst-lookup and CG 3 formats.
+
+        Returns:
+            number of sentences processed.
+        '''
+        columnar = None
+        if self.output_format == 'columnar':
+            columnar = ColumnarWriter(outfile.buffer)
+        executor = None
+        if self.threads > 1:
+            executor = ThreadPoolExecutor(self.threads)
+        work = self.linguisticate
+        if self.latency:
+            work = self.linguisticate_timed
+        # cache key and cached string, list of results or Future in order
+        pending = deque()
+        sentences = 0
+        for number, line in enumerate(self.lines(f), 1):
+            location = name + ":" + str(number)
+            key = None
+            result = None
+            if self.cache and line.strip():
+                key = self.cache.key(line, debug=self.debug,
+                                     format=self.input_format,
+                                     **self.kw, **self.segmenting)
+                result = self.cache.get(key)
+            if result is not None:
+                pass
+            elif executor:
+                result = executor.submit(work, line, location)
+            else:
+                result = work(line, location)
+            pending.append((key, result))
+            # keep enough work queued for all threads
+            while len(pending) > self.threads * 4 or \
+                    pending and not executor:
+                sentences = self.write(*pending.popleft(), name, sentences,
+                                       outfile, columnar)
+        while pending:
+            sentences = self.write(*pending.popleft(), name, sentences,
+                                   outfile, columnar)
+        if executor:
+            executor.shutdown()
+        if columnar:
+            columnar.close()
+        self.sentences += sentences
+        return sentences
+
+    def convert(self, path: str, output: str):
+        '''Process file in path into file output.
+
+        Compressed input is decompressed and output is compressed if its
+        name ends in .gz, .bz2 or .xz.
+
+        Returns:
+            number of sentences processed.
+        '''
+        with open_input(path) as infile, open_output(output) as outfile:
+            return self.run(infile, path, outfile)
+
+    def write(self, key, result, name: str, sentences: int, outfile,
+              columnar):
+        '''Write result of one input line numbering sentences after
+        sentences.
+
+        Returns:
+            number of sentences written so far
+        '''
+        if isinstance(result, Future):
+            result = result.result()
+        if isinstance(result, str):
+            sentences += 1
+            if self.debug:
+                print("DEBG")
+            print("# sent_id = " + name + "." + str(sentences) + "\n" +
+                  result, file=outfile)
+            return sentences
+        for sent in result:
+            seconds = None
+            if isinstance(sent, tuple):
+                sent, seconds = sent
+            sentences += 1
+            sent.id = name + "." + str(sentences)
+            if seconds is not None:
+                self.latency.record(sent.id, len(sent.tokens), seconds)
+            start = perf_counter() if HOOKS else None
+            if columnar:
+                columnar.write(sent)
+            elif self.output_format == 'lattice':
+                print(sent.printable_lattice(), file=outfile)
+            else:
+                printable = self.printable(sent)
+                print(printable, file=outfile)
+                if key and len(result) == 1 and not sent.comments:
+                    # without the sent_id line
+                    self.cache.put(key, printable[printable.find('\n') + 1:])
+            if start is not None:
+                emit('output', sent.location, start,
+                     format=self.output_format)
+        return sentences
@@ -4,7 +4,12 @@
 """
 Support functions for handling sentences.
 """
-from token import Token
+import json
+
+from tokens import Token
+
+# characters of punctuation tokens that can end a sentence
+FINALS = '.!?…'
 
 
 class Sentence:
@@ -14,7 +19,11 @@ class Sentence:
         """Create an empty sentence."""
         self.tokens = []
         self.id = ""
+        # input name and line number, known before the id
+        self.location = ""
         self.text = ""
+        # extra CONLL-U comment lines without the #
+        self.comments = []
 
     @staticmethod
     def fromapeline(s: str, **kw):
@@ -61,6 +70,114 @@ class Sentence:
         sentence.text = text
         return sentence
 
+    @staticmethod
+    def fromhfstlookup(s: str):
+        """Creates sentence from hfst-lookup output of one sentence.
+
+        Tokens are separated by empty lines. Spacing is not known so tokens
+        are assumed to be separated by spaces."""
+        sentence = Sentence()
+        text = ''
+        lines = list()
+        for line in s.split('\n') + ['']:
+            if line.strip():
+                lines.append(line)
+                continue
+            elif not lines:
+                continue
+            token = Token.fromhfstlookup(lines)
+            lines = list()
+            if not token or not token.surf:
+                continue
+            token.pos = len(sentence.tokens) + 1
+            if sentence.tokens:
+                token.spacebefore = True
+                sentence.tokens[-1].spaceafter = True
+                text += ' '
+            sentence.tokens.append(token)
+            text += token.surf
+        sentence.text = text
+        return sentence
+
+    @staticmethod
+    def fromcg3(s: str):
+        """Creates sentence from VISL CG 3 text format of one sentence.
+
+        Plain text lines starting with a colon between cohorts are taken as
+        spaces."""
+        sentence = Sentence()
+        text = ''
+        cohort = list()
+        blank = False
+        spacebefore = False
+        for line in s.split('\n') + ['"<>"']:
+            if line.startswith('"<'):
+                if cohort:
+                    token = Token.fromcg3(cohort)
+                    token.pos = len(sentence.tokens) + 1
+                    token.spacebefore = spacebefore
+                    if sentence.tokens:
+                        sentence.tokens[-1].spaceafter = spacebefore
+                    sentence.tokens.append(token)
+                    if spacebefore:
+                        text += ' '
+                    text += token.surf
+                cohort = [line]
+                spacebefore = blank
+                blank = False
+            elif line.startswith(':'):
+                if line[1:]:
+                    blank = True
+            elif line.startswith('\t') and cohort:
+                cohort.append(line)
+        sentence.text = text
+        return sentence
+
+    def segment(self, final=True, max_length=0):
+        '''Split sentence into sentences.
+
+        Sentences end at punctuation made of FINALS if final is set, or
+        after max_length tokens if given. Punctuation attached to the end
+        without space, such as closing quotes, stays in the sentence. Tokens
+        are renumbered in each sentence but keep their spacing. Location
+        of each sentence is this location followed by its number.
+
+        Returns:
+            list of sentences, just this one if there was nothing to split.
+        '''
+        parts = [[]]
+        ended = False
+        for token in self.tokens:
+            punct = token.analyses and \
+                all(a.get_upos() == 'PUNCT' for a in token.analyses)
+            if parts[-1] and (ended and not (punct and
+                                             not token.spacebefore) or
+                              max_length and len(parts[-1]) >= max_length):
+                parts.append([])
+                ended = False
+            parts[-1].append(token)
+            if final and punct and token.surf and \
+                    all(c in FINALS for c in token.surf):
+                ended = True
+        if len(parts) == 1:
+            return [self]
+        sentences = list()
+        offset = 0
+        for number, tokens in enumerate(parts, 1):
+            sentence = Sentence()
+            sentence.location = self.location + "." + str(number)
+            sentence.tokens = tokens
+            start = None
+            for pos, token in enumerate(tokens, 1):
+                token.pos = pos
+                offset = self.text.find(token.surf, offset)
+                if start is None:
+                    start = offset
+                offset += len(token.surf)
+            sentence.text = self.text[start:offset]
+            sentences.append(sentence)
+        return sentences
+
     def printable_conllu(self):
         '''Create CONLL-U from sentence.'''
         conllu = ""
@@ -68,6 +185,8 @@ class Sentence:
             conllu += "# sent_id = " + self.id + "\n"
         if self.text:
             conllu += "# text = " + self.text + "\n"
+        for comment in self.comments:
+            conllu += "# " + comment + "\n"
         for token in self.tokens:
             conllu += token.printable_conllu() + '\n'
         return conllu
@@ -79,6 +198,48 @@ class Sentence:
             conllu += "# sent_id = " + self.id + "\n"
         if self.text:
             conllu += "# text = " + self.text + "\n"
+        for comment in self.comments:
+            conllu += "# " + comment + "\n"
         for token in self.tokens:
             conllu += token.printable_ambigonllu() + '\n'
         return conllu
+
+    def printable_lattice(self):
+        '''Create compact JSON line of all hypotheses of sentence.
+
+        Each distinct reading, i.e. lemma, upos, feats and misc, is listed
+        once in readings and each deprel once in deprels. Tokens are
+        [form, whether space follows, hypotheses], hypotheses are [reading
+        index, head, deprel index, weight], with -1 for no head or deprel
+        and null for no weight.
+        '''
+        readings = list()
+        readingids = dict()
+        deprels = list()
+        deprelids = dict()
+        tokens = list()
+        for token in self.tokens:
+            hyps = list()
+            for anal in token.analyses:
+                misc = '|'.join(k + '=' + v for k, v in anal.misc.items())
+                reading = ('#'.join(anal.get_lemmas()), anal.get_upos(),
+                           anal.printable_ud_feats(), misc or '_')
+                if reading not in readingids:
+                    readingids[reading] = len(readings)
+                    readings.append(reading)
+                head = anal.printable_udephead()
+                deprel = -1
+                if anal.udepname:
+                    if anal.udepname not in deprelids:
+                        deprelids[anal.udepname] = len(deprels)
+                        deprels.append(anal.udepname)
+                    deprel = deprelids[anal.udepname]
+                weight = anal.weight
+                hyps.append([readingids[reading],
+                             int(head) if head != '_' else -1, deprel,
+                             weight if weight != float('inf') else None])
+            tokens.append([token.surf, token.spaceafter, hyps])
+        return json.dumps({'sent_id': self.id, 'text': self.text,
+                           'readings': readings, 'deprels': deprels,
+                           'tokens': tokens},
+                          ensure_ascii=False, separators=(',', ':'))
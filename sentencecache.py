@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Caching linguisticated sentences for repeated input lines.
+"""
+
+import dbm
+from collections import OrderedDict
+from hashlib import sha1
+
+
+class SentenceCache:
+    """A bounded cache from input lines to CONLL-U output.
+
+    Keys are hashes of the grammar fingerprint, processing options and the
+    input line, values are the CONLL-U without sent_id comment. Optionally
+    entries are also stored in a dbm file for reuse across runs.
+    """
+
+    # bump when the output of same grammar for same line changes
+    FORMAT = "1"
+
+    def __init__(self, fingerprint: str, maxsize=10000, path=None):
+        """Create cache for grammar of fingerprint.
+
+        Args:
+            fingerprint     Disamparsulator.fingerprint() of the grammar
+            maxsize         number of sentences to keep in memory
+            path            dbm file to store sentences in, if any
+        """
+        self.fingerprint = fingerprint
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.store = None
+        if path:
+            self.store = dbm.open(path, 'c')
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, line: str, **kw):
+        '''Content address for line processed with options kw.'''
+        options = ','.join(k + '=' + str(v) for k, v in sorted(kw.items()))
+        hashed = sha1()
+        for part in [SentenceCache.FORMAT, self.fingerprint, options,
+                     line.strip()]:
+            hashed.update(part.encode('utf-8'))
+            hashed.update(b'\0')
+        return hashed.hexdigest()
+
+    def get(self, key: str):
+        '''Get CONLL-U for key or None if not cached.'''
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                self.hits += 1
+                conllu = stored.decode('utf-8')
+                self.remember(key, conllu)
+                return conllu
+        self.misses += 1
+        return None
+
+    def put(self, key: str, conllu: str):
+        '''Store CONLL-U for key.'''
+        self.remember(key, conllu)
+        if self.store is not None:
+            self.store[key] = conllu.encode('utf-8')
+
+    def remember(self, key: str, conllu: str):
+        '''Keep CONLL-U in memory dropping least recently used ones.'''
+        self.entries[key] = conllu
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def close(self):
+        '''Close the dbm store if any.'''
+        if self.store is not None:
+            self.store.close()
+            self.store = None
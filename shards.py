@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Resumable conversion of large inputs in shards.
+
+Input file is split into byte ranges at line boundaries, each range is
+converted into its own output file and a manifest in the shard directory
+records which shards are done, so that a killed run can be restarted and
+only the unfinished shards are converted again. Finished shards are merged
+into one output with the same sentence ids a single run would give.
+"""
+
+import json
+import os
+
+from pipeline import Pipeline
+
+MANIFEST = 'manifest.json'
+
+
+def plan_shards(path: str, count: int):
+    '''Split file in path into at most count byte ranges at line starts.'''
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, count):
+            f.seek(max(size * i // count, starts[-1]))
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                f.readline()
+            if f.tell() > starts[-1] and f.tell() < size:
+                starts.append(f.tell())
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def shard_lines(path: str, start: int, end: int):
+    '''Read lines of file path starting in byte range start to end.'''
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line.decode('utf-8')
+
+
+def load_manifest(path: str, shard_dir: str, count: int, grammar: str,
+                  settings: dict):
+    '''Load manifest from shard_dir or create one if there is none.
+
+    Args:
+        grammar     fingerprint of the rules shards are converted with
+        settings    options affecting the output, as a dict for JSON
+    '''
+    manifest_path = os.path.join(shard_dir, MANIFEST)
+    stat = os.stat(path)
+    # as read back from JSON
+    settings = json.loads(json.dumps(settings))
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest['size'] != stat.st_size or \
+                manifest['mtime'] != stat.st_mtime:
+            print("Input", path, "has changed since shards in", shard_dir,
+                  "were made, remove them to start over")
+            exit(2)
+        if manifest.get('grammar') != grammar or \
+                manifest.get('settings') != settings:
+            print("Shards in", shard_dir, "were made with other rules or",
+                  "options, remove them to start over")
+            exit(2)
+        return manifest
+    manifest = {'input': path, 'size': stat.st_size, 'mtime': stat.st_mtime,
+                'grammar': grammar, 'settings': settings, 'shards': list()}
+    for i, (start, end) in enumerate(plan_shards(path, count)):
+        manifest['shards'].append({'start': start, 'end': end,
+                                   'output': 'shard%05d.conllu' % i,
+                                   'done': False, 'sentences': 0})
+    save_manifest(manifest, shard_dir)
+    return manifest
+
+
+def save_manifest(manifest: dict, shard_dir: str):
+    '''Atomically replace manifest in shard_dir.'''
+    manifest_path = os.path.join(shard_dir, MANIFEST)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+
+def run_shards(pipeline: Pipeline, path: str, name: str, shard_dir: str,
+               count: int, verbose=False):
+    '''Convert unfinished shards of path, recording progress in manifest.
+
+    Returns:
+        the manifest
+    '''
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = load_manifest(path, shard_dir, count,
+                             pipeline.disamparsulator.fingerprint(),
+                             pipeline.settings())
+    for i, shard in enumerate(manifest['shards']):
+        if shard['done']:
+            if verbose:
+                print("Shard", i, "already done")
+            continue
+        output = os.path.join(shard_dir, shard['output'])
+        with open(output + '.tmp', 'w', encoding='utf-8') as outfile:
+            shard['sentences'] = pipeline.run(
+                shard_lines(path, shard['start'], shard['end']), name,
+                outfile)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(output + '.tmp', output)
+        shard['done'] = True
+        save_manifest(manifest, shard_dir)
+        if verbose:
+            print("Shard", i, "done with", shard['sentences'], "sentences")
+    return manifest
+
+
+def merge_shards(manifest: dict, name: str, shard_dir: str, outfile):
+    '''Concatenate shard outputs renumbering sentence ids to run over all.
+
+    Returns:
+        number of sentences
+    '''
+    prefix = "# sent_id = " + name + "."
+    sentences = 0
+    for shard in manifest['shards']:
+        if not shard['done']:
+            print("Cannot merge unfinished shard", shard['output'])
+            exit(2)
+        with open(os.path.join(shard_dir, shard['output']),
+                  encoding='utf-8') as f:
+            for line in f:
+                if line.startswith(prefix):
+                    sentences += 1
+                    line = prefix + str(sentences) + "\n"
+                outfile.write(line)
+    return sentences
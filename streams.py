@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Splitting analyser output streams into sentences.
+
+Each function reads a file and yields strings of one sentence each, which
+can be turned into Sentence with the matching Sentence.from... function.
+"""
+
+
+def apertium_sentences(f):
+    '''Split apertium stream into sentences, one per line.'''
+    for line in f:
+        yield line
+
+
+def hfstlookup_sentences(f):
+    '''Split hfst-lookup output stream into sentences.
+
+    A sentence ends at an entry with empty surface, which is what hfst-lookup
+    prints for an empty input line.
+    '''
+    lines = list()
+    for line in f:
+        if line.startswith('\t'):
+            if lines:
+                yield ''.join(lines)
+            lines = list()
+        else:
+            lines.append(line)
+    if lines:
+        yield ''.join(lines)
+
+
+def cg3_sentences(f):
+    '''Split VISL CG 3 text format stream into sentences.
+
+    A sentence ends at an empty line, a flush command or a plain text line
+    with a newline.
+    '''
+    lines = list()
+    for line in f:
+        if not line.strip() or line.startswith('<STREAMCMD:FLUSH>') or \
+                line.startswith(':') and '\\n' in line:
+            if lines:
+                yield ''.join(lines)
+            lines = list()
+        else:
+            lines.append(line)
+    if lines:
+        yield ''.join(lines)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Caching matcher matches of readings over a whole run.
+"""
+
+from analysis import Analysis
+from decisiontree import DecisionTree
+
+
+class TargetCache:
+    """A bounded cache from readings to matchers matching them.
+
+    Readings are identified by lemma, upos and ufeats, which is all that
+    matchers look at. Each entry has the set of matching targets, the
+    agreement ufeats each of them binds and bitmap of all matching
+    matchers. The cache belongs to one compiled grammar and must be
+    replaced when the grammar changes.
+    """
+
+    def __init__(self, tree: DecisionTree, targets: set, bits: dict,
+                 maxsize=100000):
+        """Create cache for matchers compiled in tree.
+
+        Args:
+            tree        DecisionTree of all matchers
+            targets     matchers that are targets of rules
+            bits        matcher => its bit in bitmaps
+            maxsize     number of readings to remember
+        """
+        self.tree = tree
+        self.targets = targets
+        self.bits = bits
+        # matchers that need agreement checked beyond the bitmap
+        self.agreeing = set()
+        for matcher in bits:
+            if matcher.has_agreement():
+                self.agreeing.add(matcher)
+        self.maxsize = maxsize
+        self.entries = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, analysis: Analysis):
+        '''Get target matchers of analysis and their agreement bindings.
+
+        Returns:
+            set of targets, dict from target to agreement ufeats and
+            bitmap of all matching matchers
+        '''
+        key = ('#'.join(analysis.lemmas), analysis.upos,
+               frozenset(analysis.ufeats.items()))
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        matchers = self.tree.classify(analysis)
+        targets = matchers & self.targets
+        agreements = dict()
+        for target in targets:
+            agreements[target] = target.get_agreement_ufeats(analysis)
+        bitmap = 0
+        for matcher in matchers:
+            bitmap |= self.bits[matcher]
+        entry = targets, agreements, bitmap
+        if len(self.entries) >= self.maxsize:
+            self.entries.clear()
+        self.entries[key] = entry
+        return entry
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for converting many inputs with parallel jobs.
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+import unittest
+
+from batch import run_batch
+from pipeline import Pipeline
+
+from testing import GOLDEN_INPUT, load_rules
+
+
+class BatchTest(unittest.TestCase):
+    """Jobs exit like a single conversion does."""
+
+    def test_exit_in_job(self):
+        '''Input with unknown tag exits the parent instead of hanging.'''
+        pipeline = Pipeline(load_rules())
+        with tempfile.TemporaryDirectory() as tmp:
+            good = os.path.join(tmp, 'good.apes')
+            shutil.copy(GOLDEN_INPUT, good)
+            bad = os.path.join(tmp, 'bad.apes')
+            with open(bad, 'w', encoding='utf-8') as f:
+                f.write('^x/x<nosuchtag>$\n')
+            try:
+                with self.assertRaises(SystemExit) as exited:
+                    run_batch(pipeline, [good, bad], os.path.join(tmp, 'out'),
+                              jobs=2)
+            finally:
+                gc.unfreeze()
+        self.assertEqual(exited.exception.code, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for per-sentence time and operation budgets.
+"""
+
+import unittest
+
+from testing import golden_sentences, load_rules
+
+
+class BudgetTest(unittest.TestCase):
+    """Sentences over budget are marked and still form one tree."""
+
+    def setUp(self):
+        self.disamparsulator = load_rules()
+
+    def assert_degraded_tree(self, sentence):
+        '''Check every token has a head and there is one best root.'''
+        roots = 0
+        for token in sentence.tokens:
+            best = token.get_best()
+            self.assertTrue(best.udepname, token.surf)
+            if best.udepname == 'root':
+                roots += 1
+        self.assertEqual(roots, 1)
+
+    def test_op_budget(self):
+        '''Sentences over operation budget are degraded.'''
+        self.disamparsulator.op_budget = 3
+        overruns = 0
+        for sentence in golden_sentences():
+            counts = self.disamparsulator.linguisticate(sentence)
+            if counts['overruns']:
+                overruns += 1
+                self.assertIn("budget_exceeded = operations",
+                              sentence.comments)
+                self.assert_degraded_tree(sentence)
+            else:
+                self.assertEqual(sentence.comments, [])
+        self.assertTrue(overruns > 0)
+
+    def test_time_budget(self):
+        '''Sentences over time budget are degraded.'''
+        self.disamparsulator.time_budget = 1e-9
+        for sentence in golden_sentences():
+            counts = self.disamparsulator.linguisticate(sentence)
+            if counts['overruns']:
+                self.assertIn("budget_exceeded = time", sentence.comments)
+                self.assert_degraded_tree(sentence)
+
+    def test_no_budget(self):
+        '''Without budgets no sentence is marked.'''
+        for sentence in golden_sentences():
+            counts = self.disamparsulator.linguisticate(sentence)
+            self.assertEqual(counts['overruns'], 0)
+            self.assertEqual(sentence.comments, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for writing and reading columnar files.
+"""
+
+import os
+import tempfile
+import unittest
+
+from columnar import ColumnarReader, ColumnarWriter
+
+from testing import golden_sentences, load_rules
+
+
+class ColumnarTest(unittest.TestCase):
+    """Columnar file round-trips 1-best CONLL-U fields."""
+
+    def test_round_trip(self):
+        '''Read back 1-best fields equal CONLL-U output.'''
+        disamparsulator = load_rules()
+        sentences = golden_sentences()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'golden.col')
+            with open(path, 'wb') as f:
+                writer = ColumnarWriter(f)
+                for i, sentence in enumerate(sentences, 1):
+                    disamparsulator.linguisticate(sentence)
+                    sentence.id = 'golden.' + str(i)
+                    writer.write(sentence)
+                writer.close()
+            reader = ColumnarReader(path)
+            self.assertEqual(len(reader), len(sentences))
+            for i, sentence in enumerate(sentences):
+                expected = list()
+                for line in sentence.printable_conllu().splitlines():
+                    if line.startswith('#'):
+                        continue
+                    fields = line.split('\t')
+                    expected.append((int(fields[0]), fields[1], fields[2],
+                                     fields[3], fields[5], fields[6],
+                                     fields[7]))
+                sentid, tokens = reader.sentence(i)
+                self.assertEqual(sentid, sentence.id)
+                actual = list()
+                for pos, surf, lemma, upos, feats, head, deprel, weight in \
+                        tokens:
+                    best = sentence.tokens[pos - 1].get_best()
+                    self.assertEqual(weight, best.weight)
+                    actual.append((pos, surf, lemma, upos, feats,
+                                   '_' if head < 0 else str(head), deprel))
+                self.assertEqual(actual, expected)
+            reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
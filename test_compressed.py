@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for failures in background compression and decompression.
+"""
+
+import gzip
+import os
+import tempfile
+import unittest
+
+from compressed import BackgroundWriter, open_input
+
+
+class CompressedTest(unittest.TestCase):
+    """Failures in the background thread reach the caller."""
+
+    def test_corrupt_input(self):
+        '''Corrupt gzip input exits instead of waiting for chunks.'''
+        data = bytearray(gzip.compress(os.urandom(1 << 18).hex().encode()))
+        for i in range(1000, 1100):
+            data[i] ^= 0xff
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'corrupt.gz')
+            with open(path, 'wb') as f:
+                f.write(data)
+            with open_input(path) as f:
+                with self.assertRaises(SystemExit) as exited:
+                    f.read()
+        self.assertEqual(exited.exception.code, 2)
+
+    @unittest.skipUnless(os.path.exists('/dev/full'), "needs /dev/full")
+    def test_failing_output(self):
+        '''Write error is raised from write or close, not lost.'''
+        writer = BackgroundWriter('/dev/full', gzip)
+        with self.assertRaises(OSError):
+            try:
+                for _ in range(100):
+                    writer.write(os.urandom(1 << 16))
+            finally:
+                writer.close()
+        self.assertFalse(writer.thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for classifying analyses with the decision tree of all matchers.
+"""
+
+import unittest
+
+from analysis import Analysis
+from decisiontree import DecisionTree
+from matcher import Matcher
+
+from testing import golden_analyses, load_rules
+
+
+class DecisionTreeTest(unittest.TestCase):
+    """Decision tree gives same matches as Matcher.matches."""
+
+    def test_classify_equals_matches(self):
+        '''Classify golden analyses with test rules.'''
+        tree = load_rules().tree
+        self.assertTrue(len(tree) > 0)
+        for analysis in golden_analyses():
+            expected = {matcher for matcher in tree.matchers
+                        if matcher.matches(analysis)}
+            self.assertEqual(tree.classify(analysis), expected)
+
+    def test_empty_tree_matches_nothing(self):
+        '''Tree without matchers matches nothing.'''
+        analysis = Analysis.fromape('oma<adj><sg><nom>')
+        self.assertEqual(DecisionTree().classify(analysis), set())
+
+    def test_levels(self):
+        '''Upos, lemma and feat levels and matchers caring for none.'''
+        anything = Matcher()
+        noun = Matcher()
+        noun.uposes.append('NOUN')
+        plural = Matcher()
+        plural.uposes.append('NOUN')
+        plural.ufeatses.append({'Number': 'Plur'})
+        lemma = Matcher()
+        lemma.lemmas.append('livvin#karjala')
+        tree = DecisionTree()
+        tree.compile([anything, noun, plural, lemma, noun])
+        self.assertEqual(len(tree), 4)
+        self.assertEqual(tree.classify(Analysis.fromape('ainehisto<n><pl>'
+                                                        '<par>')),
+                         {anything, noun, plural})
+        self.assertEqual(tree.classify(Analysis.fromape('livvin#karjala<n>'
+                                                        '<sg><gen>')),
+                         {anything, noun, lemma})
+        self.assertEqual(tree.classify(Analysis.fromape('oma<adj><sg>'
+                                                        '<nom>')),
+                         {anything})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests against golden output written by the baseline revision.
+
+golden.conllu and golden-debug.conllu were written from golden.apeslines
+with testrules.xml before any optimisations, every engine and processing
+option that should not change the output must still give them.
+"""
+
+import gc
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from batch import run_batch
+from difftest import golden_differences, read_conllu
+from pipeline import Pipeline
+from sentencecache import SentenceCache
+
+from testing import GOLDEN_INPUT, HERE, load_rules
+
+
+def expected(debug=False):
+    '''Read golden sentences.'''
+    name = 'golden-debug.conllu' if debug else 'golden.conllu'
+    with open(os.path.join(HERE, name), encoding='utf-8') as f:
+        return read_conllu(f)
+
+
+class GoldenTest(unittest.TestCase):
+    """Output equals the golden files."""
+
+    def setUp(self):
+        self.disamparsulator = load_rules()
+
+    def assert_golden(self, linguisticate, debug=False):
+        '''Check linguisticate gives golden output for golden input.'''
+        with open(GOLDEN_INPUT, encoding='utf-8') as f:
+            diffs = golden_differences(linguisticate, f, expected(debug),
+                                       debug)
+        self.assertEqual(diffs, [])
+
+    def test_engines(self):
+        '''Default and reference engines give golden output.'''
+        self.assert_golden(self.disamparsulator.linguisticate)
+        self.assert_golden(self.disamparsulator.linguisticate_reference)
+
+    def test_debug(self):
+        '''All hypotheses are as in golden debug output.'''
+        self.assert_golden(self.disamparsulator.linguisticate, True)
+
+    def run_pipeline(self, pipeline: Pipeline):
+        '''Get sentences pipeline writes for golden input.'''
+        output = io.StringIO()
+        with open(GOLDEN_INPUT, encoding='utf-8') as f:
+            pipeline.run(f, GOLDEN_INPUT, output)
+        return read_conllu(io.StringIO(output.getvalue()))
+
+    def test_pipeline_options(self):
+        '''Threads, debug and caching pipelines give golden output.'''
+        d = self.disamparsulator
+        self.assertEqual(self.run_pipeline(Pipeline(d)), expected())
+        self.assertEqual(self.run_pipeline(Pipeline(d, threads=3)),
+                         expected())
+        self.assertEqual(self.run_pipeline(Pipeline(d, debug=True)),
+                         expected(True))
+        cached = Pipeline(d, cache=SentenceCache(d.fingerprint(), 100))
+        self.assertEqual(self.run_pipeline(cached), expected())
+        self.assertEqual(self.run_pipeline(cached), expected())
+        self.assertTrue(cached.cache.hits > 0)
+        for output_format in ['columnar', 'lattice']:
+            with self.assertRaises(SystemExit):
+                Pipeline(d, output_format=output_format,
+                         cache=SentenceCache(d.fingerprint(), 100))
+
+    def test_batch_jobs(self):
+        '''Parallel jobs with compressed files give golden output.'''
+        pipeline = Pipeline(self.disamparsulator)
+        with tempfile.TemporaryDirectory() as tmp:
+            inputs = list()
+            for name in ['first.apes.gz', 'second.apes']:
+                path = os.path.join(tmp, name)
+                with open(GOLDEN_INPUT, 'rb') as f:
+                    data = f.read()
+                if name.endswith('.gz'):
+                    data = gzip.compress(data)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                inputs.append(path)
+            output_dir = os.path.join(tmp, 'out')
+            try:
+                run_batch(pipeline, inputs, output_dir, None, '.conllu.gz',
+                          jobs=2)
+            finally:
+                gc.unfreeze()
+            for name in ['first.conllu.gz', 'second.conllu.gz']:
+                with gzip.open(os.path.join(output_dir, name), 'rt',
+                               encoding='utf-8') as f:
+                    self.assertEqual(read_conllu(f), expected())
+
+
+if __name__ == '__main__':
+    unittest.main()
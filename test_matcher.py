@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for exact lemmas and lemma patterns of matchers.
+"""
+
+import os
+import tempfile
+import unittest
+
+from analysis import Analysis
+from decisiontree import DecisionTree
+from matcher import Matcher
+
+from testing import golden_analyses, load_rules
+
+RULES = """<?xml version="1.0" encoding="UTF-8"?>
+<disamparsulations version="0.0.0">
+  <evidences>
+    <evidence name="compound heads">
+      <target>
+        <match>
+          <lemma match="compound">karjala</lemma>
+          <lemma>malli</lemma>
+          <upos>NOUN</upos>
+        </match>
+      </target>
+      <likelihood>probably</likelihood>
+    </evidence>
+    <evidence name="prefixes and suffixes">
+      <target>
+        <match>
+          <lemma match="prefix">käsi#</lemma>
+          <lemma match="suffix">ine</lemma>
+        </match>
+      </target>
+      <likelihood>possibly</likelihood>
+    </evidence>
+    <evidence name="regexes">
+      <target>
+        <match>
+          <lemma match="regex">m[uo].*|pereh</lemma>
+          <ufeats>
+            <ufeat name="Number">Plur</ufeat>
+          </ufeats>
+        </match>
+      </target>
+      <likelihood>unlikely</likelihood>
+    </evidence>
+  </evidences>
+</disamparsulations>
+"""
+
+
+def matcher_of(*lemmas, **patterns):
+    '''Create matcher of exact lemmas and kind=pattern pairs.'''
+    matcher = Matcher()
+    matcher.lemmas += lemmas
+    for kind, pattern in patterns.items():
+        matcher.lemmapatterns.append((kind, pattern))
+    return matcher
+
+
+class LemmaPatternTest(unittest.TestCase):
+    """Lemma patterns match like their descriptions."""
+
+    def lemma(self, lemma: str):
+        '''Analysis of noun lemma.'''
+        return Analysis.fromape(lemma + '<n><sg><nom>')
+
+    def test_exact_without_compiling(self):
+        '''Lemmas added in code match without compile_lemmas.'''
+        matcher = matcher_of('talo')
+        self.assertTrue(matcher.matches(self.lemma('talo')))
+        self.assertFalse(matcher.matches(self.lemma('kota')))
+
+    def test_patterns(self):
+        '''Each kind of pattern matches what it should.'''
+        talo = self.lemma('talo')
+        kesatalo = self.lemma('kesä#talo')
+        taloni = self.lemma('taloni')
+        self.assertTrue(matcher_of(prefix='tal').matches(taloni))
+        self.assertFalse(matcher_of(prefix='tal').matches(kesatalo))
+        self.assertTrue(matcher_of(suffix='alo').matches(kesatalo))
+        self.assertFalse(matcher_of(suffix='alo').matches(taloni))
+        self.assertTrue(matcher_of(compound='talo').matches(kesatalo))
+        self.assertFalse(matcher_of(compound='talo').matches(talo))
+        self.assertTrue(matcher_of(regex='ta.o|kota').matches(talo))
+        self.assertFalse(matcher_of(regex='tal').matches(talo))
+        # special characters are not patterns outside regex
+        self.assertFalse(matcher_of(prefix='t.l').matches(talo))
+        self.assertTrue(matcher_of('kota', compound='talo').matches(
+            kesatalo))
+
+    def test_tree_equals_matches(self):
+        '''Tree of pattern rules from XML equals matching.'''
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'patterns.xml')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(RULES)
+            disamparsulator = load_rules(path)
+        tree = disamparsulator.tree
+        matched = set()
+        for analysis in golden_analyses():
+            expected = {matcher for matcher in tree.matchers
+                        if matcher.matches(analysis)}
+            self.assertEqual(tree.classify(analysis), expected)
+            matched |= expected
+        self.assertEqual(len(matched), 3)
+
+    def test_tree_of_built_matchers(self):
+        '''Tree of matchers built in code equals matching.'''
+        matchers = [matcher_of('talo'), matcher_of(compound='talo'),
+                    matcher_of(prefix='kesä'), Matcher()]
+        tree = DecisionTree()
+        tree.compile(matchers)
+        for lemma in ['talo', 'kesä#talo', 'kesä', 'kota']:
+            analysis = self.lemma(lemma)
+            self.assertEqual(tree.classify(analysis),
+                             {matcher for matcher in matchers
+                              if matcher.matches(analysis)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for memory instrumentation of linguistication.
+"""
+
+import io
+import tracemalloc
+import unittest
+
+from memstats import MemoryStats
+from pipeline import Pipeline
+
+from testing import GOLDEN_INPUT, load_rules
+
+
+class MemoryStatsTest(unittest.TestCase):
+    """Copies are counted where they are made, sentences by location."""
+
+    def setUp(self):
+        self.disamparsulator = load_rules()
+        self.disamparsulator.memstats = MemoryStats()
+        with open(GOLDEN_INPUT, encoding='utf-8') as f:
+            Pipeline(self.disamparsulator).run(f, 'golden', io.StringIO())
+
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def test_copies(self):
+        '''Copies dropped as duplicates are counted but not kept.'''
+        stats = self.disamparsulator.memstats
+        copies = sum(s['copies'] for s in stats.sentences)
+        kept = sum(s['kept'] for s in stats.sentences)
+        added = sum(s['after'] - s['before'] for s in stats.sentences)
+        self.assertTrue(copies > kept > 0)
+        # pruning only removes analyses
+        self.assertTrue(kept >= added)
+        self.assertEqual(sum(rule[1] for rule in stats.rules.values()),
+                         copies)
+
+    def test_report_locations(self):
+        '''Top sentences are listed by location.'''
+        report = io.StringIO()
+        self.disamparsulator.memstats.report(report, 3)
+        lines = report.getvalue().splitlines()
+        top = lines[lines.index("Top 3 sentences by peak bytes:") + 1:][:3]
+        for line in top:
+            self.assertRegex(line, r': golden:\d+$')
+
+
+if __name__ == '__main__':
+    unittest.main()
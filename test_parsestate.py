@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for matching from reading bitmaps and barrier prefix sums.
+"""
+
+import unittest
+
+from parsestate import BarrierCounts, ParseState
+
+from testing import golden_sentences, load_rules
+
+
+class ParseStateTest(unittest.TestCase):
+    """State answers the same as matchers and sentence scans."""
+
+    def setUp(self):
+        self.disamparsulator = load_rules()
+
+    def test_matches_equals_matcher(self):
+        '''Bitmap matches equal matcher with and without agreements.'''
+        cache = self.disamparsulator.targetcache
+        for sentence in golden_sentences():
+            state = ParseState(sentence, cache)
+            analyses = [analysis for token in sentence.tokens
+                        for analysis in token.analyses]
+            for matcher in cache.bits:
+                for analysis in analyses:
+                    self.assertEqual(state.matches(matcher, analysis),
+                                     matcher.matches(analysis))
+                for target in cache.agreeing:
+                    for bound in analyses:
+                        agrs = target.get_agreement_ufeats(bound)
+                        for analysis in analyses:
+                            self.assertEqual(
+                                state.matches(matcher, analysis, agrs),
+                                matcher.matches(analysis, agrs))
+
+    def test_barrier_counts(self):
+        '''Prefix sums equal counting barriers by scanning.'''
+        for rule in self.disamparsulator.rules:
+            if 'barrier' not in rule.context:
+                continue
+            barrier = rule.context['barrier']
+            for sentence in golden_sentences():
+                counts = BarrierCounts(sentence, barrier)
+                positions = [token.pos for token in sentence.tokens]
+                for first in positions:
+                    for second in positions:
+                        left = min(first, second)
+                        right = max(first, second)
+                        expected = sum(
+                            1 for token in sentence.tokens
+                            if not left < token.pos < right
+                            for analysis in token.analyses
+                            if barrier.matches(analysis))
+                        self.assertEqual(counts.outside(first, second),
+                                         expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
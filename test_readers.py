@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for reading hfst-lookup and VISL CG 3 streams.
+"""
+
+import io
+import unittest
+
+from sentence import Sentence
+from streams import cg3_sentences, hfstlookup_sentences
+
+HFSTLOOKUP = """Oma\toma+A+Sg+Nom\t0.0
+
+mua\tmua+N+Sg+Nom\t0.5
+mua\tmua+N+Sg+Gen\t1.0
+
+xyz\txyz+?\tinf
+
+.\t.+CLB\t0.0
+
+\t+?\tinf
+
+Toine\ttoine+A+Sg+Nom\t0.0
+
+"""
+
+CG3 = """"<Oma>"
+\t"oma" A Sg Nom @>N #1->2
+:\x20
+"<mua>"
+\t"mua" N Sg Nom
+\t"mua" N Sg Gen
+;\t"mua" N Pl Nom REMOVE:12
+:\x20
+"<livvinkarjalan>"
+\t"karjala" N Sg Gen <W:0.0>
+\t\t"livvi" N Sg Nom
+:\x20
+"<xyz>"
+\t"xyz" ?
+"<.>"
+\t"." CLB
+
+"<Toine>"
+\t"toine" A Sg Nom
+"""
+
+
+def lemmas_and_uposes(token):
+    '''List lemmas and upos of each analysis of token.'''
+    return [(analysis.lemmas, analysis.upos) for analysis in token.analyses]
+
+
+class HfstLookupTest(unittest.TestCase):
+    """Sentences and tokens from hfst-lookup output."""
+
+    def setUp(self):
+        self.sentences = [Sentence.fromhfstlookup(s) for s in
+                          hfstlookup_sentences(io.StringIO(HFSTLOOKUP))]
+
+    def test_sentence_boundary(self):
+        '''Sentence ends at entry with empty surface.'''
+        self.assertEqual([s.text for s in self.sentences],
+                         ['Oma mua xyz .', 'Toine'])
+
+    def test_tokens(self):
+        '''Analyses of a token are lines of same surface.'''
+        tokens = self.sentences[0].tokens
+        self.assertEqual([token.pos for token in tokens], [1, 2, 3, 4])
+        self.assertEqual(lemmas_and_uposes(tokens[1]),
+                         [(['mua'], 'NOUN'), (['mua'], 'NOUN')])
+        self.assertEqual([a.ufeats['Case'] for a in tokens[1].analyses],
+                         ['Nom', 'Gen'])
+
+    def test_unknown(self):
+        '''Analysis ending in +? is unknown word of its surface.'''
+        self.assertEqual(lemmas_and_uposes(self.sentences[0].tokens[2]),
+                         [(['xyz'], 'X')])
+
+
+class CG3Test(unittest.TestCase):
+    """Sentences and tokens from VISL CG 3 text format."""
+
+    def setUp(self):
+        self.sentences = [Sentence.fromcg3(s) for s in
+                          cg3_sentences(io.StringIO(CG3))]
+
+    def test_sentence_boundary(self):
+        '''Sentence ends at empty line.'''
+        self.assertEqual(len(self.sentences), 2)
+        self.assertEqual(self.sentences[1].text, 'Toine')
+
+    def test_spacing(self):
+        '''Blank lines starting with colon are spaces between tokens.'''
+        sentence = self.sentences[0]
+        self.assertEqual(sentence.text, 'Oma mua livvinkarjalan xyz.')
+        self.assertEqual([t.spacebefore for t in sentence.tokens],
+                         [False, True, True, True, False])
+        self.assertEqual([t.spaceafter for t in sentence.tokens],
+                         [True, True, True, False, False])
+
+    def test_removed_readings(self):
+        '''Readings removed by CG are skipped, CG tags are dropped.'''
+        oma, mua = self.sentences[0].tokens[:2]
+        self.assertEqual(oma.analyses[0].ufeats,
+                         {'Number': 'Sing', 'Case': 'Nom'})
+        self.assertEqual([a.ufeats['Case'] for a in mua.analyses],
+                         ['Nom', 'Gen'])
+
+    def test_compound(self):
+        '''Subreadings are compound parts before the lemma.'''
+        token = self.sentences[0].tokens[2]
+        self.assertEqual(lemmas_and_uposes(token),
+                         [(['livvi', 'karjala'], 'NOUN')])
+        self.assertEqual(token.analyses[0].weight, 1.0)
+        self.assertEqual(token.analyses[0].ufeats['Case'], 'Gen')
+
+    def test_unknown(self):
+        '''Reading with tag ? is unknown word.'''
+        self.assertEqual(lemmas_and_uposes(self.sentences[0].tokens[3]),
+                         [(['xyz'], 'X')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for skipping evidences that only reweigh other analyses.
+"""
+
+import os
+import unittest
+
+from testing import HERE, golden_sentences, load_rules
+
+RULES = os.path.join(HERE, 'testreweighs.xml')
+
+
+class ReweighingTest(unittest.TestCase):
+    """Skipping reweighing rules on unambiguous tokens changes nothing."""
+
+    def setUp(self):
+        self.disamparsulator = load_rules(RULES)
+
+    def test_rules_are_reweighing(self):
+        '''Evidences before and after dep rules are found reweighing.'''
+        names = [self.disamparsulator.rules[i].name
+                 for i in sorted(self.disamparsulator.reweighing)]
+        self.assertEqual(names, ["nominative nouns probably",
+                                 "adjectives usually before nouns",
+                                 "verbs possibly unless punct to the right",
+                                 "adessives probably",
+                                 "nouns meh without verbs"])
+
+    def test_equals_reference(self):
+        '''Fast path gives all hypotheses of the reference engine.'''
+        skipped = 0
+        for sentence, reference in zip(golden_sentences(),
+                                       golden_sentences()):
+            counts = self.disamparsulator.linguisticate(sentence)
+            skipped += counts['skipped_rules']
+            self.disamparsulator.linguisticate_reference(reference)
+            self.assertEqual(sentence.printable_ambigonllu(),
+                             reference.printable_ambigonllu())
+            self.assertEqual(sentence.printable_conllu(),
+                             reference.printable_conllu())
+        self.assertTrue(skipped > 0)
+
+    def test_rules_fire(self):
+        '''Reweighing rules change some hypotheses of the golden input.'''
+        plain = load_rules()
+        changed = 0
+        for sentence, other in zip(golden_sentences(), golden_sentences()):
+            self.disamparsulator.linguisticate(sentence)
+            plain.linguisticate(other)
+            if sentence.printable_ambigonllu() != \
+                    other.printable_ambigonllu():
+                changed += 1
+        self.assertTrue(changed > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for segmenting input lines into sentences.
+"""
+
+import io
+import unittest
+
+from pipeline import Pipeline
+from sentence import Sentence
+
+from testing import load_rules
+
+LINE = '^Oma/oma<adj><sg><nom>$ ^mua/mua<n><sg><nom>$^./.<punct>$ ' \
+    '^"/"<punct>$^Mua/mua<n><sg><nom>$ ^oma/oma<adj><sg><nom>$' \
+    '^./.<punct>$^"/"<punct>$ ^Toine/toine<adj><sg><nom>$ ' \
+    '^mua/mua<n><sg><nom>$^./.<punct>$'
+
+
+def surfaces(sentence):
+    '''List positions and surfaces of tokens of sentence.'''
+    return [(token.pos, token.surf) for token in sentence.tokens]
+
+
+class SegmentTest(unittest.TestCase):
+    """Lines split at final punctuation and at maximum length."""
+
+    def test_split_at_final(self):
+        '''Split after full stop, closing quote stays in its sentence.'''
+        sentences = Sentence.fromapeline(LINE).segment()
+        self.assertEqual([s.text for s in sentences],
+                         ['Oma mua.', '"Mua oma."', 'Toine mua.'])
+        self.assertEqual(surfaces(sentences[1]),
+                         [(1, '"'), (2, 'Mua'), (3, 'oma'), (4, '.'),
+                          (5, '"')])
+        self.assertEqual(surfaces(sentences[2]),
+                         [(1, 'Toine'), (2, 'mua'), (3, '.')])
+        self.assertTrue(sentences[2].tokens[0].spacebefore)
+
+    def test_max_length(self):
+        '''Split after max_length tokens without final punctuation.'''
+        sentences = Sentence.fromapeline(LINE).segment(False, 4)
+        self.assertEqual([s.text for s in sentences],
+                         ['Oma mua. "', 'Mua oma."', 'Toine mua.'])
+        self.assertEqual([len(s.tokens) for s in sentences], [4, 4, 3])
+        self.assertEqual(surfaces(sentences[1])[0], (1, 'Mua'))
+
+    def test_nothing_to_split(self):
+        '''Sentence without split points is returned as is.'''
+        sentence = Sentence.fromapeline(LINE)
+        self.assertEqual(sentence.segment(False, 0), [sentence])
+        self.assertEqual(sentence.segment(False, 20), [sentence])
+
+    def test_pipeline_ids(self):
+        '''Segmented sentences get running ids and their own text.'''
+        pipeline = Pipeline(load_rules(), segment=True)
+        output = io.StringIO()
+        pipeline.run(io.StringIO(LINE + '\n\n' + LINE + '\n'), 'x', output)
+        comments = [line for line in output.getvalue().splitlines()
+                    if line.startswith('#')]
+        self.assertEqual(comments,
+                         ['# sent_id = x.1', '# text = Oma mua.',
+                          '# sent_id = x.2', '# text = "Mua oma."',
+                          '# sent_id = x.3', '# text = Toine mua.',
+                          '# sent_id = x.4', '# text = Oma mua.',
+                          '# sent_id = x.5', '# text = "Mua oma."',
+                          '# sent_id = x.6', '# text = Toine mua.'])
+
+
+if __name__ == '__main__':
+    unittest.main()
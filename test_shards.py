@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for sharded, resumable conversion.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+
+from pipeline import Pipeline
+from shards import load_manifest, merge_shards, run_shards, save_manifest
+
+from testing import GOLDEN_INPUT, load_rules
+
+
+def pipeline_with(op_budget=0):
+    '''Create pipeline of test rules.'''
+    disamparsulator = load_rules()
+    disamparsulator.op_budget = op_budget
+    return Pipeline(disamparsulator)
+
+
+def convert_whole(pipeline: Pipeline):
+    '''Convert test input without shards.'''
+    output = io.StringIO()
+    with open(GOLDEN_INPUT, encoding='utf-8') as f:
+        pipeline.run(f, GOLDEN_INPUT, output)
+    return output.getvalue()
+
+
+class ShardsTest(unittest.TestCase):
+    """Shards merge to the output of a single run."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.shard_dir = os.path.join(self.tmp.name, 'shards')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def merged(self, pipeline: Pipeline):
+        '''Run shards of test input and merge them.'''
+        manifest = run_shards(pipeline, GOLDEN_INPUT, GOLDEN_INPUT,
+                              self.shard_dir, 4)
+        output = io.StringIO()
+        sentences = merge_shards(manifest, GOLDEN_INPUT, self.shard_dir,
+                                 output)
+        return sentences, output.getvalue()
+
+    def test_merge_equals_whole(self):
+        '''Merged shards equal converting at once.'''
+        pipeline = pipeline_with()
+        expected = convert_whole(pipeline)
+        sentences, merged = self.merged(pipeline)
+        self.assertEqual(merged, expected)
+        self.assertEqual(sentences, expected.count('# sent_id = '))
+
+    def test_resume(self):
+        '''Resumed run redoes unfinished shard only.'''
+        pipeline = pipeline_with()
+        _, expected = self.merged(pipeline)
+        # as if killed while converting the second shard
+        manifest = load_manifest(GOLDEN_INPUT, self.shard_dir, 4,
+                                 pipeline.disamparsulator.fingerprint(),
+                                 pipeline.settings())
+        self.assertEqual(len(manifest['shards']), 4)
+        manifest['shards'][1]['done'] = False
+        os.remove(os.path.join(self.shard_dir,
+                               manifest['shards'][1]['output']))
+        save_manifest(manifest, self.shard_dir)
+        _, merged = self.merged(pipeline_with())
+        self.assertEqual(merged, expected)
+
+    def test_refuse_other_settings(self):
+        '''Shards made with other settings are not resumed.'''
+        self.merged(pipeline_with())
+        with self.assertRaises(SystemExit):
+            self.merged(pipeline_with(op_budget=3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for caching matches of readings over a run.
+"""
+
+import unittest
+
+from analysis import Analysis
+from targetcache import TargetCache
+
+from testing import golden_analyses, load_rules
+
+
+class TargetCacheTest(unittest.TestCase):
+    """Cache entries equal matching from scratch."""
+
+    def setUp(self):
+        self.disamparsulator = load_rules()
+
+    def test_lookup_equals_matches(self):
+        '''Cache entries equal matching from scratch.'''
+        cache = self.disamparsulator.targetcache
+        for analysis in golden_analyses():
+            targets, agreements, bitmap = cache.lookup(analysis)
+            matchers = {matcher for matcher in cache.bits
+                        if matcher.matches(analysis)}
+            self.assertEqual(targets, matchers & cache.targets)
+            for target in targets:
+                self.assertEqual(agreements[target],
+                                 target.get_agreement_ufeats(analysis))
+            for matcher, bit in cache.bits.items():
+                self.assertEqual(bool(bitmap & bit), matcher in matchers)
+
+    def test_hits_and_size(self):
+        '''Hits are counted and cache is bounded.'''
+        d = self.disamparsulator
+        cache = TargetCache(d.tree, set(d.targetrules), d.matcherbits,
+                            maxsize=1)
+        noun = Analysis.fromape('mua<n><sg><nom>')
+        entry = cache.lookup(noun)
+        self.assertIs(cache.lookup(Analysis.fromape('mua<n><sg><nom>')),
+                      entry)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.lookup(Analysis.fromape('oma<adj><sg><nom>'))
+        self.assertEqual(len(cache.entries), 1)
+        self.assertEqual(cache.lookup(noun), entry)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
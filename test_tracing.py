@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for tracing hooks around processing stages.
+"""
+
+import io
+import json
+import unittest
+
+from pipeline import Pipeline
+from tracing import ChromeTrace, add_hook, remove_hook
+
+from testing import GOLDEN_INPUT, load_rules
+
+
+class TracingTest(unittest.TestCase):
+    """Hooks get every stage of a sentence with the same location."""
+
+    def setUp(self):
+        self.events = list()
+        add_hook(self.hook)
+
+    def tearDown(self):
+        remove_hook(self.hook)
+
+    def hook(self, stage, location, start, duration, counters):
+        '''Remember event.'''
+        self.assertTrue(start > 0 and duration >= 0)
+        self.events.append((stage, location, counters))
+
+    def run_pipeline(self, pipeline: Pipeline):
+        '''Run golden input through pipeline, return output.'''
+        output = io.StringIO()
+        with open(GOLDEN_INPUT, encoding='utf-8') as f:
+            pipeline.run(f, 'golden', output)
+        return output.getvalue()
+
+    def stages(self):
+        '''Map locations to the set of their stages.'''
+        stages = dict()
+        for stage, location, _ in self.events:
+            stages.setdefault(location, set()).add(stage)
+        return stages
+
+    def test_locations(self):
+        '''All stages have the location from before parsing.'''
+        output = self.run_pipeline(Pipeline(load_rules(), threads=2))
+        stages = self.stages()
+        self.assertNotIn('', stages)
+        self.assertEqual(stages['golden:1'],
+                         {'parse', 'apply', 'linguisticate', 'output'})
+        # empty line between sentences
+        self.assertEqual(stages['golden:2'], {'parse'})
+        outputs = [location for location, names in stages.items()
+                   if 'output' in names]
+        self.assertEqual(len(outputs), output.count('# sent_id = '))
+        for location in outputs:
+            self.assertIn('linguisticate', stages[location])
+
+    def test_segmented_locations(self):
+        '''Sentences of a segmented line are numbered after its location.'''
+        pipeline = Pipeline(load_rules(), max_length=3)
+        self.run_pipeline(pipeline)
+        stages = self.stages()
+        self.assertEqual(stages['golden:3'], {'parse'})
+        self.assertIn('output', stages['golden:3.1'])
+        self.assertIn('output', stages['golden:3.2'])
+
+    def test_chrome_trace(self):
+        '''Chrome trace is JSON of events with sentence locations.'''
+        f = io.StringIO()
+        trace = ChromeTrace(f)
+        add_hook(trace)
+        try:
+            self.run_pipeline(Pipeline(load_rules()))
+        finally:
+            remove_hook(trace)
+        trace.close()
+        events = json.loads(f.getvalue())
+        self.assertEqual(len(events), len(self.events))
+        self.assertEqual([event['args']['sentence'] for event in events],
+                         [location for _, location, _ in self.events])
+
+
+if __name__ == '__main__':
+    unittest.main()
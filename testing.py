@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fixtures shared by the tests: test rules and golden input.
+"""
+
+import os
+
+from disamparsulator import Disamparsulator
+from sentence import Sentence
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+RULES = os.path.join(HERE, 'testrules.xml')
+GOLDEN_INPUT = os.path.join(HERE, 'golden.apeslines')
+
+
+def load_rules(*rulefiles):
+    '''Load disamparsulator from rulefiles, testrules.xml by default.'''
+    disamparsulator = Disamparsulator()
+    disamparsulator.frobblesnizz(*rulefiles or [RULES])
+    return disamparsulator
+
+
+def golden_sentences():
+    '''Parse golden test input into sentences.'''
+    sentences = list()
+    with open(GOLDEN_INPUT, encoding='utf-8') as f:
+        for line in f:
+            sentence = Sentence.fromapeline(line.strip())
+            if sentence.text:
+                sentences.append(sentence)
+    return sentences
+
+
+def golden_analyses():
+    '''List all analyses of the golden test input.'''
+    analyses = list()
+    for sentence in golden_sentences():
+        for token in sentence.tokens:
+            analyses += token.analyses
+    return analyses
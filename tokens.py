@@ -45,6 +45,61 @@ class Token:
             token.analyses.append(analysis)
         return token
 
+    @staticmethod
+    def fromhfstlookup(lines: list):
+        '''Create a token from hfst-lookup output lines of one token.
+
+        Each line has surface, giella analysis and optionally weight separated
+        by tabs, unknown words have analysis ending in `+?`.
+        '''
+        token = None
+        for line in lines:
+            fields = line.split('\t')
+            if len(fields) < 2:
+                print("Not a token in hfst-lookup output:", line)
+                return None
+            if token is None:
+                token = Token(fields[0])
+            if fields[1].endswith('+?'):
+                analysis = Analysis.fromgiella('*' + fields[0])
+            else:
+                analysis = Analysis.fromgiella(fields[1])
+            token.analyses.append(analysis)
+        return token
+
+    @staticmethod
+    def fromcg3(lines: list):
+        '''Create a token from a cohort in VISL CG 3 text format.
+
+        First line is the word form `"<surf>"` and following lines are
+        readings `"lemma" Tag Tag` indented with tabs. More deeply indented
+        subreadings are compound parts before the lemma of their reading.
+        Tags of CG 3 itself, such as syntactic functions, dependencies and
+        rule traces, are skipped.
+        '''
+        if not lines or not lines[0].startswith('"<') or \
+                not lines[0].endswith('>"'):
+            print("Not a cohort in CG 3 stream:", lines)
+            return None
+        token = Token(lines[0][2:-2])
+        readings = list()
+        for line in lines[1:]:
+            reading = line.strip()
+            if not line.startswith('\t') or not reading.startswith('"'):
+                # removed readings and such
+                continue
+            lemmaend = reading.rfind('"')
+            lemma = reading[1:lemmaend]
+            tags = tuple(tag for tag in reading[lemmaend + 1:].split()
+                         if tag[0] not in '<@#' and ':' not in tag)
+            if not line.startswith('\t\t'):
+                readings.append(([lemma], tags))
+            elif readings:
+                readings[-1][0].insert(0, lemma)
+        for lemmas, tags in readings:
+            token.analyses.append(Analysis.fromgiellatags(lemmas, tags))
+        return token
+
     def printable_conllu(self):
         '''Create CONLL-U output based on token's 1-best analysis.'''
         lemma = self.surf